@@ -4,27 +4,38 @@ from app.schemas.user import UserCreate, UserResponse, Token, APIResponse, Login
 from app.deps import get_auth_service, get_current_user
 from app.repositories.user_repository import UserRepository
 from app.core.database import get_db
+from app.services.user_cache import user_cache
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.services.password_hasher import PasswordHasherBusy
 
 router = APIRouter()
 
+def _hasher_busy() -> HTTPException:
+    return HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Authentication is busy, retry shortly", headers={"Retry-After": "1"})
+
 @router.post("/register", response_model=APIResponse, status_code=status.HTTP_201_CREATED)
-def register(user: UserCreate, service = Depends(get_auth_service)):
+async def register(user: UserCreate, service = Depends(get_auth_service)):
     try:
-        created = service.register(user.username, user.password, name=user.name, email=user.email)
+        created = await service.register(user.username, user.password, name=user.name, email=user.email)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except PasswordHasherBusy:
+        raise _hasher_busy()
     return APIResponse(success=True, message="User registered", data={"user": UserResponse.model_validate(created).model_dump()})
 
 @router.post("/login", response_model=APIResponse)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), service = Depends(get_auth_service), db: Session = Depends(get_db)):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), service = Depends(get_auth_service), db: Session = Depends(get_db)):
     try:
-        user = service.authenticate(form_data.username, form_data.password)
+        user = await service.authenticate(form_data.username, form_data.password)
     except ValueError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    except PasswordHasherBusy:
+        raise _hasher_busy()
     token = service.create_token(user.username)
     # update last_login
-    UserRepository(db).update_last_login(user)
+    await run_in_threadpool(UserRepository(db).update_last_login, user)
+    user_cache.invalidate(user.username)
     return APIResponse(success=True, message="Login successful", data={
         "token": {"access_token": token, "token_type": "bearer"},
         "user": UserResponse.model_validate(user).model_dump()
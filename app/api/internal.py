@@ -0,0 +1,34 @@
+from fastapi import APIRouter
+from app.schemas.user import APIResponse
+from app.services.ingest_buffer import ingest_buffer
+from app.services.query_cache import query_cache
+from app.services.password_hasher import password_hasher
+from app.core.config import settings
+from app.core import database
+
+
+router = APIRouter()
+
+
+@router.get("/stats/ingest", response_model=APIResponse)
+def ingest_stats():
+    return APIResponse(success=True, message="Ingest stats fetched", data={"mode": settings.INGEST_MODE, **ingest_buffer.stats()})
+
+
+@router.get("/stats/query-cache", response_model=APIResponse)
+def query_cache_stats():
+    return APIResponse(success=True, message="Query cache stats fetched", data={"enabled": settings.QUERY_CACHE_ENABLED, **query_cache.stats()})
+
+
+@router.get("/stats/hashing", response_model=APIResponse)
+def hashing_stats():
+    return APIResponse(success=True, message="Hashing stats fetched", data=password_hasher.stats())
+
+
+@router.get("/stats/db-pool", response_model=APIResponse)
+def db_pool_stats():
+    pools = {"sync": database.engine.pool}
+    if database.async_engine is not None:
+        pools["async"] = database.async_engine.pool
+    data = {name: pool.describe() if hasattr(pool, "describe") else {"pool": pool.status()} for name, pool in pools.items()}
+    return APIResponse(success=True, message="DB pool stats fetched", data=data)
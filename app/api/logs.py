@@ -1,36 +1,136 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.concurrency import iterate_in_threadpool
 from sqlalchemy.orm import Session
-from typing import Optional
-from datetime import datetime
+from typing import Callable, Iterator, Optional
+from datetime import datetime, timezone
+import csv
+import io
+import json
+import os
 from app.core.database import get_db
 from app.repositories.log_repository import LogRepository
-from app.services.log_service import LogService
-from app.schemas.log import LogCreate, LogUpdate, LogResponse, LogQuery, LogAggregateResponse
+from app.services.log_service import LogService, log_json
+from app.services.ingest_buffer import IngestBuffer, get_ingest_buffer
+from app.services.export_cache import ExportCache, export_key
+from app.schemas.log import LogCreate, LogBatchCreate, LogUpdate, LogResponse, LogQuery, LogAggregateResponse
 from app.schemas.user import APIResponse
+from app.core.cache import TTLCache
 from app.core.redis_conn import get_queue
-from app.jobs.export_jobs import export_logs_csv_job
+from app.core.serialization import FastJSONResponse
+from app.jobs.export_jobs import (
+    export_logs_csv_job,
+    export_retry,
+    enqueue_partitioned_export,
+    export_media_type,
+    format_csv_row,
+    split_time_range,
+    EXPORT_HEADER,
+    FAILED_PART_STATUSES,
+)
+from app.core.config import settings
+from rq.job import Job
 import redis
 
 
 router = APIRouter()
+# Hot read/ingest endpoints; app.api.logs_async provides async replacements for them when ASYNC_DB is on.
+# Mounted after `router`, so static paths like /stream are matched before /{log_id}
+core_router = APIRouter()
+
+STREAM_BATCH_SIZE = 1000
+# Recent export status responses, so clients polling in tight loops share one Redis lookup per job
+_export_status_cache = TTLCache(maxsize=settings.EXPORT_STATUS_CACHE_SIZE, ttl=settings.EXPORT_STATUS_CACHE_TTL)
 
 def get_log_service(db: Session = Depends(get_db)):
     return LogService(LogRepository(db))
 
-@router.post("/", response_model=APIResponse, status_code=status.HTTP_201_CREATED)
-def create_log(body: LogCreate, svc: LogService = Depends(get_log_service)):
+@core_router.post("/", response_model=APIResponse, status_code=status.HTTP_201_CREATED)
+def create_log(
+    body: LogCreate,
+    response: Response,
+    svc: LogService = Depends(get_log_service),
+    buffer: Optional[IngestBuffer] = Depends(get_ingest_buffer),
+):
+    if buffer is not None:
+        # Stamped now, so a row keeps its accept time however long it waits for the flush
+        if not buffer.put({**body.model_dump(), "timestamp": datetime.now(timezone.utc)}):
+            raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail="Ingest buffer full", headers={"Retry-After": "1"})
+        response.status_code = status.HTTP_202_ACCEPTED
+        return APIResponse(success=True, message="Log accepted", data=None)
     log = svc.create(body.severity, body.source, body.message)
     return APIResponse(success=True, message="Log created", data={"log": LogResponse.model_validate(log).model_dump()})
 
-@router.get("/{log_id}", response_model=APIResponse)
+@core_router.post("/batch", response_model=APIResponse, status_code=status.HTTP_201_CREATED)
+def create_logs_batch(body: LogBatchCreate, svc: LogService = Depends(get_log_service)):
+    result = svc.create_batch(body.items)
+    if not result["accepted"]:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_CONTENT, detail=result["errors"])
+    return APIResponse(success=True, message="Logs created", data=result)
+
+def _ndjson_chunk(batch: list) -> str:
+    return "".join(
+        json.dumps({"id": r.id, "timestamp": r.timestamp.isoformat(), "severity": r.severity, "source": r.source, "message": r.message}) + "\n"
+        for r in batch
+    )
+
+
+def _csv_text(rows) -> str:
+    buf = io.StringIO()
+    csv.writer(buf).writerows(rows)
+    return buf.getvalue()
+
+
+def _csv_chunk(batch: list) -> str:
+    return _csv_text(format_csv_row(r) for r in batch)
+
+
+async def _stream_chunks(batches: Iterator[list], encode: Callable[[list], str], header: Optional[str]):
+    # Each batch is fetched off the event loop; if the client disconnects the task is cancelled
+    # and closing the generator releases the database cursor instead of finishing the query
+    try:
+        if header:
+            yield header
+        async for batch in iterate_in_threadpool(batches):
+            yield encode(batch)
+    finally:
+        batches.close()
+
+
+@router.get("/stream")
+def stream_logs(
+    format: str = Query(default="ndjson", pattern="^(ndjson|csv)$"),
+    start: Optional[datetime] = Query(default=None),
+    end: Optional[datetime] = Query(default=None),
+    severity: Optional[str] = Query(default=None),
+    source: Optional[str] = Query(default=None),
+    q: Optional[str] = Query(default=None, max_length=200),
+    svc: LogService = Depends(get_log_service),
+):
+    batches = svc.stream(start, end, severity, source, STREAM_BATCH_SIZE, q)
+    if format == "csv":
+        return StreamingResponse(_stream_chunks(batches, _csv_chunk, _csv_text([EXPORT_HEADER])), media_type="text/csv")
+    return StreamingResponse(_stream_chunks(batches, _ndjson_chunk, None), media_type="application/x-ndjson")
+
+@core_router.get("/{log_id}", response_model=APIResponse)
 def get_log(log_id: int, svc: LogService = Depends(get_log_service)):
     log = svc.get(log_id)
     if not log:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Log not found")
     return APIResponse(success=True, message="Log fetched", data={"log": LogResponse.model_validate(log).model_dump()})
 
-@router.get("/", response_model=APIResponse)
+def list_payload(result: dict, limit: int, offset: int) -> dict:
+    return {
+        "logs": [log_json(l) for l in result["items"]],
+        "total": result["total"],
+        "total_mode": result["total_mode"],
+        "total_exact": result["total_exact"],
+        "limit": limit,
+        "offset": offset,
+        "next_cursor": result["next_cursor"],
+    }
+
+@core_router.get("/", response_model=APIResponse)
 def list_logs(
     start: Optional[datetime] = Query(default=None),
     end: Optional[datetime] = Query(default=None),
@@ -38,19 +138,17 @@ def list_logs(
     source: Optional[str] = Query(default=None),
     limit: int = Query(default=100, ge=1, le=1000),
     offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = Query(default=None, description="Opaque next_cursor from a previous page; replaces offset"),
+    total: str = Query(default="exact", pattern="^(exact|none|estimate|cached)$", description="How the total is computed"),
+    q: Optional[str] = Query(default=None, max_length=200, description="Full-text search over messages; all terms must match"),
     svc: LogService = Depends(get_log_service),
 ):
-    result = svc.list(start, end, severity, source, limit, offset)
-    return APIResponse(
-        success=True,
-        message="Logs fetched",
-        data={
-            "logs": [LogResponse.model_validate(l).model_dump() for l in result["items"]],
-            "total": result["total"],
-            "limit": limit,
-            "offset": offset,
-        },
-    )
+    try:
+        result = svc.list(start, end, severity, source, limit, offset, cursor, total, q)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    # Serialized straight to bytes; the output is identical to returning the APIResponse
+    return FastJSONResponse({"success": True, "message": "Logs fetched", "data": list_payload(result, limit, offset)})
 
 @router.patch("/{log_id}", response_model=APIResponse)
 def update_log(log_id: int, body: LogUpdate, svc: LogService = Depends(get_log_service)):
@@ -68,7 +166,7 @@ def delete_log(log_id: int, svc: LogService = Depends(get_log_service)):
     return APIResponse(success=True, message="Log deleted", data=None)
 
 
-@router.get("/aggregate/by/{by}", response_model=APIResponse)
+@core_router.get("/aggregate/by/{by}", response_model=APIResponse)
 def aggregate_logs(
     by: str,
     start: Optional[datetime] = Query(default=None),
@@ -81,29 +179,101 @@ def aggregate_logs(
     return APIResponse(success=True, message="Aggregates fetched", data={"aggregation": {"by": by, "buckets": buckets}})
 
 
+@core_router.get("/aggregate/histogram", response_model=APIResponse)
+def histogram_logs(
+    interval: str = Query(default="1h", pattern="^(1m|5m|1h|1d)$"),
+    split: Optional[str] = Query(default=None, pattern="^(severity|source)$"),
+    start: Optional[datetime] = Query(default=None),
+    end: Optional[datetime] = Query(default=None),
+    severity: Optional[str] = Query(default=None),
+    source: Optional[str] = Query(default=None),
+    svc: LogService = Depends(get_log_service),
+):
+    try:
+        histogram = svc.histogram(start, end, severity, source, interval, split)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return APIResponse(success=True, message="Histogram fetched", data={"histogram": histogram})
+
+
 @router.post("/export", response_model=APIResponse)
 def enqueue_export(
     start: Optional[datetime] = Query(default=None),
     end: Optional[datetime] = Query(default=None),
     severity: Optional[str] = Query(default=None),
     source: Optional[str] = Query(default=None),
+    compress: bool = Query(default=False, description="Write a gzip-compressed CSV"),
+    format: str = Query(default="csv", pattern="^(csv|parquet|arrow)$", description="csv, parquet, or arrow (IPC stream)"),
+    parts: int = Query(default=1, ge=1, le=settings.EXPORT_MAX_PARTS, description="Split the time range into this many concurrent sub-jobs"),
+    q: Optional[str] = Query(default=None, max_length=200, description="Full-text search over messages"),
+    reuse: bool = Query(default=True, description="Reuse a recent or in-flight export with the same filters"),
+    svc: LogService = Depends(get_log_service),
 ):
-    q = get_queue("exports")
-    job = q.enqueue(export_logs_csv_job, start.isoformat() if start else None, end.isoformat() if end else None, severity, source)
-    return APIResponse(success=True, message="Export enqueued", data={"job_id": job.get_id()})
+    queue = get_queue("exports")
+    cache = ExportCache(queue)
+    key = export_key(start, end, severity, source, compress, format, q)
+    existing, how, job_id = cache.acquire(key, reuse)
+    if existing is not None:
+        data = {"job_id": existing.id, "reused": how}
+        if "parts" in existing.meta:
+            data["parts"] = len(existing.meta["parts"])
+        if how == "finished":
+            return APIResponse(success=True, message="Export ready", data={**data, "status": "finished", "path": existing.return_value()})
+        return APIResponse(success=True, message="Export already in progress", data=data)
+    try:
+        if parts > 1:
+            lo, hi = svc.time_bounds(start, end, severity, source, q)
+            if lo is not None:
+                job = enqueue_partitioned_export(queue, split_time_range(lo, hi, parts), severity, source, compress, format, q, job_id=job_id)
+                return APIResponse(success=True, message="Export enqueued", data={"job_id": job.id, "parts": len(job.meta["parts"])})
+        job = queue.enqueue(
+            export_logs_csv_job, start.isoformat() if start else None, end.isoformat() if end else None, severity, source, compress, format,
+            q=q, retry=export_retry(), job_id=job_id, result_ttl=settings.EXPORT_MAX_AGE,
+        )
+    except BaseException:
+        cache.release(key, job_id)
+        raise
+    return APIResponse(success=True, message="Export enqueued", data={"job_id": job.id})
 
 
 @router.get("/export/{job_id}", response_model=APIResponse)
 def export_status(job_id: str):
+    if settings.EXPORT_STATUS_CACHE_TTL <= 0:
+        return _export_status(job_id)
+    cached = _export_status_cache.get(job_id)
+    if cached is None:
+        cached = _export_status(job_id)
+        _export_status_cache.set(job_id, cached)
+    return cached
+
+
+def _export_status(job_id: str) -> APIResponse:
     q = get_queue("exports")
     job = q.fetch_job(job_id)
     if not job:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    part_ids = job.meta.get("parts")
+    progress = job.meta.get("progress")
+    failed_parts = 0
+    if part_ids:
+        parts = Job.fetch_many(part_ids, connection=q.connection)
+        statuses = [part.get_status() if part else "missing" for part in parts]
+        part_progress = [part.meta.get("progress") or {} for part in parts if part]
+        estimates = [p.get("total_estimate") for p in part_progress]
+        progress = {
+            "parts": len(statuses),
+            "finished": statuses.count("finished"),
+            "failed": sum(1 for s in statuses if s in FAILED_PART_STATUSES),
+            "rows": sum(p.get("rows", 0) for p in part_progress),
+            "total_estimate": sum(estimates) if estimates and None not in estimates else None,
+            "bytes": sum(p.get("bytes", 0) for p in part_progress),
+        }
+        failed_parts = progress["failed"]
     if job.is_finished:
-        return APIResponse(success=True, message="Export ready", data={"status": "finished", "path": job.result})
-    if job.is_failed:
-        return APIResponse(success=False, message="Export failed", data={"status": "failed"})
-    return APIResponse(success=True, message="Export pending", data={"status": job.get_status()})
+        return APIResponse(success=True, message="Export ready", data={"status": "finished", "path": job.result, "progress": progress})
+    if job.is_failed or failed_parts:
+        return APIResponse(success=False, message="Export failed", data={"status": "failed", "progress": progress})
+    return APIResponse(success=True, message="Export pending", data={"status": job.get_status(), "progress": progress})
 
 
 @router.get("/export/{job_id}/download")
@@ -112,4 +282,6 @@ def download_export(job_id: str):
     job = q.fetch_job(job_id)
     if not job or not job.is_finished:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Export not ready")
-    return FileResponse(job.result, filename=job.result.split("/")[-1], media_type="text/csv")
+    if not os.path.exists(job.result):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Export file has expired")
+    return FileResponse(job.result, filename=job.result.split("/")[-1], media_type=export_media_type(job.result))
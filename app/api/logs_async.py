@@ -0,0 +1,100 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from datetime import datetime, timezone
+from app.core.database import get_async_db
+from app.repositories.log_repository import AsyncLogRepository
+from app.services.log_service import AsyncLogService
+from app.services.ingest_buffer import IngestBuffer, get_ingest_buffer
+from app.schemas.log import LogCreate, LogBatchCreate, LogResponse
+from app.schemas.user import APIResponse
+from app.api.logs import list_payload
+from app.core.serialization import FastJSONResponse
+
+
+# Async versions of app.api.logs.core_router, mounted in its place when ASYNC_DB is on
+router = APIRouter()
+
+
+def get_async_log_service(db: AsyncSession = Depends(get_async_db)):
+    return AsyncLogService(AsyncLogRepository(db))
+
+@router.post("/", response_model=APIResponse, status_code=status.HTTP_201_CREATED)
+async def create_log(
+    body: LogCreate,
+    response: Response,
+    svc: AsyncLogService = Depends(get_async_log_service),
+    buffer: Optional[IngestBuffer] = Depends(get_ingest_buffer),
+):
+    if buffer is not None:
+        # Stamped now, so a row keeps its accept time however long it waits for the flush
+        if not buffer.put({**body.model_dump(), "timestamp": datetime.now(timezone.utc)}):
+            raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail="Ingest buffer full", headers={"Retry-After": "1"})
+        response.status_code = status.HTTP_202_ACCEPTED
+        return APIResponse(success=True, message="Log accepted", data=None)
+    log = await svc.create(body.severity, body.source, body.message)
+    return APIResponse(success=True, message="Log created", data={"log": LogResponse.model_validate(log).model_dump()})
+
+@router.post("/batch", response_model=APIResponse, status_code=status.HTTP_201_CREATED)
+async def create_logs_batch(body: LogBatchCreate, svc: AsyncLogService = Depends(get_async_log_service)):
+    result = await svc.create_batch(body.items)
+    if not result["accepted"]:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_CONTENT, detail=result["errors"])
+    return APIResponse(success=True, message="Logs created", data=result)
+
+@router.get("/{log_id}", response_model=APIResponse)
+async def get_log(log_id: int, svc: AsyncLogService = Depends(get_async_log_service)):
+    log = await svc.get(log_id)
+    if not log:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Log not found")
+    return APIResponse(success=True, message="Log fetched", data={"log": LogResponse.model_validate(log).model_dump()})
+
+@router.get("/", response_model=APIResponse)
+async def list_logs(
+    start: Optional[datetime] = Query(default=None),
+    end: Optional[datetime] = Query(default=None),
+    severity: Optional[str] = Query(default=None),
+    source: Optional[str] = Query(default=None),
+    limit: int = Query(default=100, ge=1, le=1000),
+    offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = Query(default=None, description="Opaque next_cursor from a previous page; replaces offset"),
+    total: str = Query(default="exact", pattern="^(exact|none|estimate|cached)$", description="How the total is computed"),
+    q: Optional[str] = Query(default=None, max_length=200, description="Full-text search over messages; all terms must match"),
+    svc: AsyncLogService = Depends(get_async_log_service),
+):
+    try:
+        result = await svc.list(start, end, severity, source, limit, offset, cursor, total, q)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    # Serialized straight to bytes; the output is identical to returning the APIResponse
+    return FastJSONResponse({"success": True, "message": "Logs fetched", "data": list_payload(result, limit, offset)})
+
+
+@router.get("/aggregate/by/{by}", response_model=APIResponse)
+async def aggregate_logs(
+    by: str,
+    start: Optional[datetime] = Query(default=None),
+    end: Optional[datetime] = Query(default=None),
+    severity: Optional[str] = Query(default=None),
+    source: Optional[str] = Query(default=None),
+    svc: AsyncLogService = Depends(get_async_log_service),
+):
+    buckets = await svc.aggregate(start, end, severity, source, by)
+    return APIResponse(success=True, message="Aggregates fetched", data={"aggregation": {"by": by, "buckets": buckets}})
+
+
+@router.get("/aggregate/histogram", response_model=APIResponse)
+async def histogram_logs(
+    interval: str = Query(default="1h", pattern="^(1m|5m|1h|1d)$"),
+    split: Optional[str] = Query(default=None, pattern="^(severity|source)$"),
+    start: Optional[datetime] = Query(default=None),
+    end: Optional[datetime] = Query(default=None),
+    severity: Optional[str] = Query(default=None),
+    source: Optional[str] = Query(default=None),
+    svc: AsyncLogService = Depends(get_async_log_service),
+):
+    try:
+        histogram = await svc.histogram(start, end, severity, source, interval, split)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return APIResponse(success=True, message="Histogram fetched", data={"histogram": histogram})
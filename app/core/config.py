@@ -5,12 +5,72 @@ load_dotenv()
 
 class Settings:
     DATABASE_URL: str = os.getenv("DATABASE_URL", "postgresql://root@localhost:5432/demo")
+    # Connection pool per engine (the async engine gets its own pool with the same settings)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    # Seconds before a connection is replaced; -1 keeps connections indefinitely
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "-1"))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "false").lower() == "true"
+    # Serve the hot log endpoints as async handlers over asyncpg/aiosqlite instead of the threadpool
+    ASYNC_DB: bool = os.getenv("ASYNC_DB", "false").lower() == "true"
     SECRET_KEY: str = os.getenv("SECRET_KEY", "super-secret-key")
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
     DEBUG: bool = os.getenv("DEBUG", "False").lower() == "true"
     API_V1_STR: str = "/api/v1"
     PROJECT_NAME: str = "User Authentication API"
+    # Password hashing runs in its own process pool; calls beyond MAX_PENDING get 503 instead of queueing
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    PASSWORD_HASH_MAX_PENDING: int = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+    # Users resolved from tokens are cached this long ("memory" per process or "redis" shared); 0 disables
+    USER_CACHE_TTL: int = int(os.getenv("USER_CACHE_TTL", "30"))
+    USER_CACHE_SIZE: int = int(os.getenv("USER_CACHE_SIZE", "10000"))
+    USER_CACHE_BACKEND: str = os.getenv("USER_CACHE_BACKEND", "memory").lower()
+    LOG_BATCH_MAX_ITEMS: int = int(os.getenv("LOG_BATCH_MAX_ITEMS", "10000"))
+    # "sync" commits each log in the request; "buffered" queues it for group commit and returns 202
+    INGEST_MODE: str = os.getenv("INGEST_MODE", "sync").lower()
+    INGEST_BUFFER_SIZE: int = int(os.getenv("INGEST_BUFFER_SIZE", "50000"))
+    INGEST_FLUSH_BATCH: int = int(os.getenv("INGEST_FLUSH_BATCH", "1000"))
+    INGEST_FLUSH_INTERVAL_MS: int = int(os.getenv("INGEST_FLUSH_INTERVAL_MS", "200"))
+    # Entries per process-wide severity/source/message id cache
+    LOG_DICTIONARY_CACHE_SIZE: int = int(os.getenv("LOG_DICTIONARY_CACHE_SIZE", "100000"))
+    # Message ids can be pruned by retention, so cached messages are refreshed after this many seconds
+    LOG_DICTIONARY_CACHE_TTL: int = int(os.getenv("LOG_DICTIONARY_CACHE_TTL", "3600"))
+    LOG_COUNT_ESTIMATE_CAP: int = int(os.getenv("LOG_COUNT_ESTIMATE_CAP", "10000"))
+    LOG_COUNT_CACHE_TTL: int = int(os.getenv("LOG_COUNT_CACHE_TTL", "30"))
+    LOG_COUNT_CACHE_SIZE: int = int(os.getenv("LOG_COUNT_CACHE_SIZE", "1024"))
+    # Serve aggregates from per-minute rollups; the rollups are kept up to date on every write either way
+    LOG_ROLLUPS_ENABLED: bool = os.getenv("LOG_ROLLUPS_ENABLED", "true").lower() == "true"
+    # Cache list/aggregate results in Redis; every log write invalidates them
+    QUERY_CACHE_ENABLED: bool = os.getenv("QUERY_CACHE_ENABLED", "false").lower() == "true"
+    QUERY_CACHE_TTL: int = int(os.getenv("QUERY_CACHE_TTL", "30"))
+    QUERY_CACHE_MAX_ENTRIES: int = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "10000"))
+    HISTOGRAM_MAX_BUCKETS: int = int(os.getenv("HISTOGRAM_MAX_BUCKETS", "1000"))
+    # "none", "day" or "month"; time partitions are created on Postgres only
+    LOG_PARTITIONING: str = os.getenv("LOG_PARTITIONING", "none").lower()
+    LOG_PARTITION_PREMAKE: int = int(os.getenv("LOG_PARTITION_PREMAKE", "3"))
+    # Logs older than this are removed by the retention job; 0 keeps everything
+    LOG_RETENTION_DAYS: int = int(os.getenv("LOG_RETENTION_DAYS", "0"))
+    LOG_RETENTION_BATCH_SIZE: int = int(os.getenv("LOG_RETENTION_BATCH_SIZE", "10000"))
+    EXPORT_MAX_PARTS: int = int(os.getenv("EXPORT_MAX_PARTS", "16"))
+    # CSV exports checkpoint their position every EXPORT_CHECKPOINT_ROWS rows; a retry resumes from there
+    EXPORT_CHECKPOINT_ROWS: int = int(os.getenv("EXPORT_CHECKPOINT_ROWS", "100000"))
+    EXPORT_PROGRESS_INTERVAL: float = float(os.getenv("EXPORT_PROGRESS_INTERVAL", "1"))
+    EXPORT_MAX_RETRIES: int = int(os.getenv("EXPORT_MAX_RETRIES", "2"))
+    EXPORT_RETRY_INTERVAL: int = int(os.getenv("EXPORT_RETRY_INTERVAL", "0"))
+    # Identical export requests reuse a finished file for EXPORT_CACHE_TTL seconds; files are evicted by
+    # the worker's sweeper after EXPORT_MAX_AGE seconds or when EXPORT_DIR exceeds EXPORT_DIR_MAX_BYTES
+    EXPORT_CACHE_TTL: int = int(os.getenv("EXPORT_CACHE_TTL", "600"))
+    EXPORT_MAX_AGE: int = int(os.getenv("EXPORT_MAX_AGE", "86400"))
+    EXPORT_DIR_MAX_BYTES: int = int(os.getenv("EXPORT_DIR_MAX_BYTES", str(10 * 1024 ** 3)))
+    EXPORT_SWEEP_INTERVAL: int = int(os.getenv("EXPORT_SWEEP_INTERVAL", "60"))
+    # Shared per-process Redis pool; callers wait up to REDIS_POOL_TIMEOUT seconds for a free connection
+    REDIS_MAX_CONNECTIONS: int = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+    REDIS_POOL_TIMEOUT: float = float(os.getenv("REDIS_POOL_TIMEOUT", "5"))
+    # Export status responses are reused for this many seconds; 0 disables
+    EXPORT_STATUS_CACHE_TTL: float = float(os.getenv("EXPORT_STATUS_CACHE_TTL", "1"))
+    EXPORT_STATUS_CACHE_SIZE: int = int(os.getenv("EXPORT_STATUS_CACHE_SIZE", "10000"))
 
 settings = Settings()
 
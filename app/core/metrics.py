@@ -0,0 +1,220 @@
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Minimal Prometheus text-format metrics kept in process memory. Each update is a dict lookup and an
+# increment under a per-metric lock, cheap enough to leave on. Values are per process: with several
+# uvicorn workers each one reports its own numbers.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0, 5.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+JOB_BUCKETS = (1.0, 5.0, 15.0, 30.0, 60.0, 300.0, 900.0, 3600.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        lines.extend(f"{self.name}{_labels(self.labelnames, key)} {_number(value)}" for key, value in items)
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # Per label set: [count per bucket (+Inf last), sum]
+        self._series: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._series.items())
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "Request latency by route template", ("method", "route", "status")
+)
+http_request_sql_statements = Histogram(
+    "http_request_sql_statements", "SQL statements executed per request", ("method", "route"), COUNT_BUCKETS
+)
+sql_statement_duration = Histogram(
+    "sql_statement_duration_seconds", "SQL statement execution time by operation", ("operation",), SQL_BUCKETS
+)
+log_rows_ingested = Counter("log_rows_ingested_total", "Log rows written to the database")
+
+REGISTRY = [http_request_duration, http_request_sql_statements, sql_statement_duration, log_rows_ingested]
+
+# Statement counter of the request being served; shared with threadpool handlers through the copied context
+_request_statements: ContextVar[Optional[List[int]]] = ContextVar("request_statements", default=None)
+
+_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE"}
+
+
+def render(extra: Sequence[str] = ()) -> str:
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    lines.extend(extra)
+    return "\n".join(lines) + "\n"
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Time every statement on the engine and count it against the current request."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        _finish(conn, statement)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        if exception_context.connection is not None and exception_context.connection.info.get("metrics_started"):
+            _finish(exception_context.connection, exception_context.statement)
+
+
+def _finish(conn, statement: Optional[str]) -> None:
+    elapsed = time.perf_counter() - conn.info["metrics_started"].pop()
+    keyword = statement.lstrip().split(None, 1)[0].upper() if statement and statement.strip() else ""
+    sql_statement_duration.observe(elapsed, keyword if keyword in _OPERATIONS else "OTHER")
+    counter = _request_statements.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording latency and SQL statement count per route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status = [500]
+        statements = [0]
+        token = _request_statements.set(statements)
+
+        async def _send(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            _request_statements.reset(token)
+            # The router stores the matched route in the scope; unmatched paths share one label to bound cardinality
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            http_request_duration.observe(time.perf_counter() - started, scope["method"], template, status[0])
+            http_request_sql_statements.observe(statements[0], scope["method"], template)
+
+
+# Job durations are recorded by worker processes, so they live in a Redis hash instead of process memory.
+# Fields are "<job>|<status>|<le>" (cumulative), "<job>|<status>|sum" and "<job>|<status>|count".
+JOB_DURATION_KEY = "metrics:rq_job_duration_seconds"
+
+
+def record_job_duration(connection, job_name: str, status: str, seconds: float) -> None:
+    prefix = f"{job_name}|{status}"
+    pipe = connection.pipeline(transaction=False)
+    for bound in JOB_BUCKETS + (float("inf"),):
+        if seconds <= bound:
+            pipe.hincrby(JOB_DURATION_KEY, f"{prefix}|{_number(bound)}", 1)
+    pipe.hincrbyfloat(JOB_DURATION_KEY, f"{prefix}|sum", seconds)
+    pipe.hincrby(JOB_DURATION_KEY, f"{prefix}|count", 1)
+    pipe.execute()
+
+
+def render_job_durations(connection) -> List[str]:
+    name = "rq_job_duration_seconds"
+    series: Dict[Tuple[str, str], Dict[str, str]] = {}
+    for field, value in connection.hgetall(JOB_DURATION_KEY).items():
+        job_name, status, part = field.decode().split("|")
+        series.setdefault((job_name, status), {})[part] = value.decode()
+    lines = [f"# HELP {name} Duration of finished and failed RQ jobs", f"# TYPE {name} histogram"]
+    for (job_name, status), parts in sorted(series.items()):
+        labels = ("job", "status")
+        for bound in JOB_BUCKETS + (float("inf"),):
+            le = f'le="{_number(bound)}"'
+            lines.append(f"{name}_bucket{_labels(labels, (job_name, status), le)} {parts.get(_number(bound), '0')}")
+        lines.append(f"{name}_sum{_labels(labels, (job_name, status))} {parts.get('sum', '0')}")
+        lines.append(f"{name}_count{_labels(labels, (job_name, status))} {parts.get('count', '0')}")
+    return lines
+
+
+def render_queue(connection, name: str) -> List[str]:
+    from rq import Queue
+
+    queue = Queue(name, connection=connection)
+    depths = {
+        "queued": queue.count,
+        "started": queue.started_job_registry.count,
+        "deferred": queue.deferred_job_registry.count,
+        "scheduled": queue.scheduled_job_registry.count,
+        "failed": queue.failed_job_registry.count,
+    }
+    lines = ["# HELP rq_queue_jobs Jobs in the queue and its registries", "# TYPE rq_queue_jobs gauge"]
+    lines.extend(f"rq_queue_jobs{_labels(('queue', 'state'), (name, state))} {n}" for state, n in depths.items())
+    return lines
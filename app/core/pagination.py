@@ -0,0 +1,22 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Tuple
+
+
+def encode_cursor(timestamp: datetime, log_id: int) -> str:
+    # Opaque token for keyset pagination: the (timestamp, id) of the last row on the page
+    raw = json.dumps([timestamp.isoformat(), log_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[datetime, int]:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        ts, log_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(log_id, int):
+            raise ValueError
+        return datetime.fromisoformat(ts), log_id
+    except (ValueError, TypeError, binascii.Error, UnicodeError):
+        raise ValueError("Invalid cursor")
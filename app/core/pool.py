@@ -0,0 +1,89 @@
+import threading
+import time
+from typing import Any, Dict
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolStats:
+    """Counters for one connection pool: how long checkouts wait, how often they time out, connection churn."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.peak_in_use = 0
+
+    def checkout(self, waited: float, in_use: int) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+            self.peak_in_use = max(self.peak_in_use, in_use)
+
+    def count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "wait_avg_ms": round(self.wait_seconds / self.checkouts * 1000, 3) if self.checkouts else None,
+                "wait_max_ms": round(self.max_wait_seconds * 1000, 3),
+                "timeouts": self.timeouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "peak_in_use": self.peak_in_use,
+            }
+
+
+class _InstrumentedPoolMixin:
+    # Checkout waits are timed around QueuePool._do_get, the one place a caller blocks on a full pool
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        stats = self.stats = PoolStats()
+        # recreate() (engine.dispose) copies these listeners into the new pool, which keeps the same stats
+        if "_dispatch" not in kwargs:
+            event.listen(self, "connect", lambda dbapi_connection, record: stats.count("connects"))
+            event.listen(self, "invalidate", lambda dbapi_connection, record, exception: stats.count("invalidations"))
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.count("timeouts")
+            raise
+        self.stats.checkout(time.perf_counter() - started, self.checkedout())
+        return conn
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "size": self.size(),
+            "in_use": self.checkedout(),
+            "idle": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "max_overflow": self._max_overflow,
+            "timeout": self._timeout,
+            "recycle": self._recycle,
+            "pre_ping": self._pre_ping,
+            **self.stats.snapshot(),
+        }
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
@@ -1,14 +1,35 @@
 import os
+import threading
+from typing import Dict, Optional
 from rq import Queue
-from redis import Redis
+from redis import BlockingConnectionPool, Redis
+from app.core.config import settings
 
+# One connection pool and one Queue per name for the whole process, so requests reuse open
+# connections instead of dialing Redis each time. redis-py resets the pool in forked children.
+_pool: Optional[BlockingConnectionPool] = None
+_queues: Dict[str, Queue] = {}
+_lock = threading.Lock()
 
-def get_redis() -> Redis:
-    url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
-    return Redis.from_url(url)
 
+def get_redis_pool() -> BlockingConnectionPool:
+    global _pool
+    if _pool is None:
+        with _lock:
+            if _pool is None:
+                url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+                # Blocks for a free connection rather than failing when every one is in use
+                _pool = BlockingConnectionPool.from_url(url, max_connections=settings.REDIS_MAX_CONNECTIONS, timeout=settings.REDIS_POOL_TIMEOUT)
+    return _pool
 
-def get_queue(name: str = "default") -> Queue:
-    return Queue(name, connection=get_redis())
 
+def get_redis() -> Redis:
+    return Redis(connection_pool=get_redis_pool())
 
+
+def get_queue(name: str = "default") -> Queue:
+    queue = _queues.get(name)
+    if queue is None:
+        with _lock:
+            queue = _queues.setdefault(name, Queue(name, connection=get_redis()))
+    return queue
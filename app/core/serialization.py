@@ -0,0 +1,34 @@
+import json
+from typing import Any
+from pydantic_core import to_jsonable_python
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional, the stdlib path produces the same bytes
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    """JSON bytes identical to FastAPI's default response for the same content, without validating it again.
+
+    Datetimes come out in pydantic's format (ISO 8601, UTC as "Z"); everything else must already be plain JSON types.
+    """
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+        default=to_jsonable_python,
+    ).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    # Returning a Response from a route also skips FastAPI's response_model validation
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
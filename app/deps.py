@@ -6,6 +6,8 @@ from app.repositories.user_repository import UserRepository
 from app.services.auth_service import AuthService
 from app.core import security
 from app.core.config import settings
+from app.schemas.user import ProfileResponse
+from app.services.user_cache import user_cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
@@ -15,14 +17,21 @@ def get_user_repo(db: Session = Depends(get_db)):
 def get_auth_service(user_repo: UserRepository = Depends(get_user_repo)):
     return AuthService(user_repo)
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> ProfileResponse:
     payload = security.decode_access_token(token)
     if not payload:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token")
     username = payload.get("sub")
     if not username:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload")
-    user = UserRepository(db).get_by_username(username)
-    if not user:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-    return user
\ No newline at end of file
+    # Cache hits skip the database entirely; the session from get_db never connects
+    user = user_cache.get(username)
+    if user is None:
+        record = UserRepository(db).get_by_username(username)
+        if not record:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+        user = ProfileResponse.model_validate(record)
+        user_cache.set(username, user)
+    if not user.is_active:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User is inactive")
+    return user
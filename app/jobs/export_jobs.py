@@ -1,52 +1,412 @@
+import contextlib
 import csv
+import gzip
 import io
 import os
-from datetime import datetime
-from typing import Optional
+import shutil
+import time
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator, List, Optional, Tuple
+from rq import Queue, Retry, get_current_job
+from rq.job import Job
 from sqlalchemy.orm import Session
+from app.core.config import settings
 from app.core.database import SessionLocal
+from app.jobs.export_sweeper import SEGMENT_SUFFIX
 from app.repositories.log_repository import LogRepository
 
+EXPORT_HEADER = ["timestamp", "severity", "source", "message"]
+EXPORT_BATCH_SIZE = 5000
+# Rows per Parquet row group; batches are accumulated up to this size before each write
+EXPORT_ROW_GROUP_SIZE = 100_000
+EXPORT_FORMATS = ("csv", "parquet", "arrow")
+EXPORT_MEDIA_TYPES = {
+    ".csv": "text/csv",
+    ".gz": "application/gzip",
+    ".parquet": "application/vnd.apache.parquet",
+    ".arrows": "application/vnd.apache.arrow.stream",
+}
 
-def export_logs_csv_job(start: Optional[str], end: Optional[str], severity: Optional[str], source: Optional[str]) -> str:
+
+def _to_dt(v: Optional[str]) -> Optional[datetime]:
+    # Parse ISO strings to datetime if provided
+    if not v:
+        return None
+    try:
+        return datetime.fromisoformat(v)
+    except Exception:
+        return None
+
+
+def format_csv_row(row) -> list:
+    # Format timestamp as YYYY-MM-DD HH:MM:SS
+    timestamp_str = row.timestamp.strftime("%Y-%m-%d %H:%M:%S") if row.timestamp else ""
+    return [timestamp_str, row.severity, row.source, row.message]
+
+
+def export_media_type(path: str) -> str:
+    return EXPORT_MEDIA_TYPES.get(os.path.splitext(path)[1], "application/octet-stream")
+
+
+def _export_extension(export_format: str, compress: bool) -> str:
+    if export_format == "parquet":
+        return ".parquet"
+    if export_format == "arrow":
+        return ".arrows"
+    return ".csv.gz" if compress else ".csv"
+
+
+def _export_path(export_format: str, compress: bool) -> str:
+    now = datetime.utcnow().strftime("%Y%m%d%H%M%S")
+    # The job id keeps concurrent exports (e.g. the parts of one partitioned export) from colliding
+    job = get_current_job()
+    filename = f"logs_export_{now}" + (f"_{job.id}" if job else "") + _export_extension(export_format, compress)
+    out_dir = os.getenv("EXPORT_DIR", "/tmp")
+    os.makedirs(out_dir, exist_ok=True)
+    return os.path.join(out_dir, filename)
+
+
+def _csv_header_bytes() -> bytes:
+    buf = io.StringIO()
+    csv.writer(buf).writerow(EXPORT_HEADER)
+    return buf.getvalue().encode("utf-8")
+
+
+class _CsvPartWriter:
+    """Writes CSV rows as bytes to a file that can be cut back to any checkpoint and appended to.
+
+    Compressed output is a series of gzip members, one per checkpoint interval, so every checkpoint
+    offset is a valid end of file.
+    """
+
+    def __init__(self, path: str, compress: bool, offset: int = 0):
+        self.compress = compress
+        self.raw = open(path, "r+b" if offset else "wb")
+        if offset:
+            self.raw.truncate(offset)
+            self.raw.seek(offset)
+        self._out = self._open_member()
+
+    def _open_member(self):
+        return gzip.GzipFile(fileobj=self.raw, mode="wb") if self.compress else self.raw
+
+    def write_rows(self, rows: Iterable[list]) -> None:
+        buf = io.StringIO()
+        csv.writer(buf).writerows(rows)
+        self._out.write(buf.getvalue().encode("utf-8"))
+
+    @property
+    def bytes_written(self) -> int:
+        return self.raw.tell()
+
+    def checkpoint(self) -> int:
+        # Everything before the returned offset is durable and complete
+        if self.compress:
+            self._out.close()
+        self.raw.flush()
+        os.fsync(self.raw.fileno())
+        offset = self.raw.tell()
+        if self.compress:
+            self._out = self._open_member()
+        return offset
+
+    def close(self) -> None:
+        if self.compress:
+            self._out.close()
+        self.raw.close()
+
+
+class ExportProgress:
+    """Publishes rows written, estimated total and bytes in the job's meta, at most every EXPORT_PROGRESS_INTERVAL seconds."""
+
+    def __init__(self, job: Optional[Job], total_estimate: Optional[int], rows: int = 0):
+        self.job = job
+        self.total_estimate = total_estimate
+        self.rows = rows
+        self.bytes = 0
+        self._saved_at = 0.0
+
+    def add(self, rows: int, bytes_written: int) -> None:
+        self.rows += rows
+        self.bytes = bytes_written
+        if time.monotonic() - self._saved_at >= settings.EXPORT_PROGRESS_INTERVAL:
+            self.save()
+
+    def track(self, batches: Iterable[list], path: str) -> Iterator[list]:
+        # For writers that consume the batches themselves; bytes is what has reached the file so far
+        for batch in batches:
+            yield batch
+            self.add(len(batch), os.path.getsize(path) if os.path.exists(path) else 0)
+
+    def save(self, **meta) -> None:
+        if self.job is None:
+            return
+        self.job.meta["progress"] = {"rows": self.rows, "total_estimate": self.total_estimate, "bytes": self.bytes}
+        self.job.meta.update(meta)
+        self.job.save_meta()
+        self._saved_at = time.monotonic()
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc as ipc
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("pyarrow is required for parquet and arrow exports")
+    return pa, ipc, pq
+
+
+def _write_columnar(path: str, batches: Iterable[list], export_format: str) -> None:
+    pa, ipc, pq = _import_pyarrow()
+
+    # Native UTC timestamps; severity and source are low-cardinality, so dictionary-encode them
+    schema = pa.schema([
+        ("timestamp", pa.timestamp("us", tz="UTC")),
+        ("severity", pa.dictionary(pa.int32(), pa.string())),
+        ("source", pa.dictionary(pa.int32(), pa.string())),
+        ("message", pa.string()),
+    ])
+
+    def _to_batch(rows: list):
+        return pa.record_batch([
+            pa.array([r.timestamp for r in rows], type=schema.field("timestamp").type),
+            pa.array([r.severity for r in rows], type=pa.string()).dictionary_encode(),
+            pa.array([r.source for r in rows], type=pa.string()).dictionary_encode(),
+            pa.array([r.message for r in rows], type=pa.string()),
+        ], schema=schema)
+
+    if export_format == "parquet":
+        with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+            pending: list = []
+            for batch in batches:
+                pending.extend(batch)
+                if len(pending) >= EXPORT_ROW_GROUP_SIZE:
+                    writer.write_batch(_to_batch(pending), row_group_size=len(pending))
+                    pending = []
+            if pending:
+                writer.write_batch(_to_batch(pending), row_group_size=len(pending))
+        return
+
+    # The IPC stream format allows each batch to carry its own dictionaries
+    options = ipc.IpcWriteOptions(compression="zstd")
+    with pa.OSFile(path, "wb") as sink, ipc.new_stream(sink, schema, options=options) as writer:
+        for batch in batches:
+            writer.write_batch(_to_batch(batch))
+
+
+def _concat_parts(path: str, part_paths: List[str], compress: bool, export_format: str) -> None:
+    if export_format == "csv":
+        # Parts are headerless; gzip parts are complete members, and concatenated members are a valid gzip file
+        header = _csv_header_bytes()
+        with open(path, "wb") as out:
+            out.write(gzip.compress(header) if compress else header)
+            for part_path in part_paths:
+                with open(part_path, "rb") as f:
+                    shutil.copyfileobj(f, out)
+        return
+
+    pa, ipc, pq = _import_pyarrow()
+    if export_format == "parquet":
+        writer = None
+        try:
+            for part_path in part_paths:
+                part = pq.ParquetFile(part_path)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, part.schema_arrow, compression="zstd")
+                for i in range(part.num_row_groups):
+                    writer.write_table(part.read_row_group(i))
+        finally:
+            if writer is not None:
+                writer.close()
+        return
+
+    with pa.OSFile(path, "wb") as sink:
+        writer = None
+        try:
+            for part_path in part_paths:
+                with pa.OSFile(part_path, "rb") as source:
+                    reader = ipc.open_stream(source)
+                    if writer is None:
+                        writer = ipc.new_stream(sink, reader.schema, options=ipc.IpcWriteOptions(compression="zstd"))
+                    for batch in reader:
+                        writer.write_batch(batch)
+        finally:
+            if writer is not None:
+                writer.close()
+
+
+def split_time_range(lo: datetime, hi: datetime, parts: int) -> List[Tuple[datetime, datetime]]:
+    """Split [lo, hi] into up to `parts` contiguous inclusive ranges that do not overlap, newest first."""
+    step = (hi - lo) / parts
+    if parts <= 1 or step < timedelta(microseconds=1):
+        return [(lo, hi)]
+    edges = [lo + step * i for i in range(parts)] + [hi]
+    ranges = []
+    for i in range(parts):
+        upper = hi if i == parts - 1 else edges[i + 1] - timedelta(microseconds=1)
+        ranges.append((edges[i], upper))
+    # Exports are ordered newest first, so the parts are concatenated in that order too
+    return ranges[::-1]
+
+
+# Part states after which a partitioned export's finalize job can never run; "missing" is an expired part
+FAILED_PART_STATUSES = ("failed", "stopped", "canceled", "missing")
+
+
+def enqueue_partitioned_export(
+    queue: Queue,
+    ranges: List[Tuple[datetime, datetime]],
+    severity: Optional[str],
+    source: Optional[str],
+    compress: bool,
+    export_format: str,
+    q: Optional[str] = None,
+    job_id: Optional[str] = None,
+) -> Job:
+    parts = [
+        # Kept as long as the export itself: rq treats an expired dependency as met, and finalize needs every part
+        queue.enqueue(
+            export_logs_csv_job, lo.isoformat(), hi.isoformat(), severity, source, compress, export_format, False, q=q, part=True,
+            retry=export_retry(), result_ttl=settings.EXPORT_MAX_AGE, failure_ttl=settings.EXPORT_MAX_AGE,
+        )
+        for lo, hi in ranges
+    ]
+    part_ids = [job.id for job in parts]
+    return queue.enqueue(
+        finalize_export_job, part_ids, compress, export_format,
+        depends_on=parts, meta={"parts": part_ids}, job_id=job_id, result_ttl=settings.EXPORT_MAX_AGE,
+    )
+
+
+def finalize_export_job(part_ids: List[str], compress: bool = False, export_format: str = "csv") -> str:
+    connection = get_current_job().connection
+    parts = Job.fetch_many(part_ids, connection=connection)
+    missing = [part_id for part_id, part in zip(part_ids, parts) if part is None or part.return_value() is None]
+    if missing:
+        raise RuntimeError(f"Export parts expired or produced no output: {', '.join(missing)}")
+    part_paths = [part.return_value() for part in parts]
+    path = _export_path(export_format, compress)
+    tmp_path = path + ".part"
+    try:
+        _concat_parts(tmp_path, part_paths, compress, export_format)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    for part_path in part_paths:
+        # A retried finalize may already have removed some of them
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(part_path)
+    return path
+
+
+def export_retry() -> Optional[Retry]:
+    # Retried exports resume from their last checkpoint, including ones abandoned by a dead worker
+    if settings.EXPORT_MAX_RETRIES <= 0:
+        return None
+    return Retry(max=settings.EXPORT_MAX_RETRIES, interval=settings.EXPORT_RETRY_INTERVAL)
+
+
+def _estimate_total(repo: LogRepository, start: Optional[datetime], end: Optional[datetime], severity: Optional[str], source: Optional[str], q: Optional[str]) -> int:
+    # The planner estimate is free on Postgres; elsewhere one count is small next to the export itself
+    estimate = repo.estimate_count(start, end, severity, source, q)
+    return estimate if estimate is not None else repo.count(start, end, severity, source, q)
+
+
+def _write_csv_resumable(
+    tmp_path: str,
+    repo: LogRepository,
+    filters: tuple,
+    compress: bool,
+    header: bool,
+    job: Optional[Job],
+    progress: ExportProgress,
+) -> None:
+    # The checkpoint is the keyset position of the last row before `offset`; a retry cuts the file back
+    # to that offset and continues the stream after that row
+    checkpoint = job.meta.get("checkpoint") if job is not None else None
+    if checkpoint and (not os.path.exists(tmp_path) or os.path.getsize(tmp_path) < checkpoint["offset"]):
+        checkpoint = None
+    cursor = None
+    if checkpoint:
+        ts, log_id = checkpoint["cursor"]
+        cursor = (datetime.fromisoformat(ts), log_id)
+        progress.rows = checkpoint["rows"]
+
+    writer = _CsvPartWriter(tmp_path, compress, checkpoint["offset"] if checkpoint else 0)
+    batches = None
+    try:
+        if header and not checkpoint:
+            writer.write_rows([EXPORT_HEADER])
+        start, end, severity, source, q = filters
+        batches = repo.stream(start, end, severity, source, EXPORT_BATCH_SIZE, cursor=cursor, q=q)
+        since_checkpoint = 0
+        for batch in batches:
+            writer.write_rows(format_csv_row(l) for l in batch)
+            since_checkpoint += len(batch)
+            progress.add(len(batch), writer.bytes_written)
+            if job is not None and since_checkpoint >= settings.EXPORT_CHECKPOINT_ROWS:
+                last = batch[-1]
+                offset = writer.checkpoint()
+                progress.save(checkpoint={"cursor": [last.timestamp.isoformat(), last.id], "offset": offset, "rows": progress.rows})
+                since_checkpoint = 0
+    finally:
+        if batches is not None:
+            batches.close()
+        writer.close()
+
+
+def export_logs_csv_job(
+    start: Optional[str],
+    end: Optional[str],
+    severity: Optional[str],
+    source: Optional[str],
+    compress: bool = False,
+    export_format: str = "csv",
+    header: bool = True,
+    q: Optional[str] = None,
+    part: bool = False,
+) -> str:
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+    job = get_current_job()
     db: Session = SessionLocal()
     try:
         repo = LogRepository(db)
-        # Parse ISO strings to datetime if provided
-        def _to_dt(v: Optional[str]) -> Optional[datetime]:
-            if not v:
-                return None
-            try:
-                return datetime.fromisoformat(v)
-            except Exception:
-                return None
         start_dt = _to_dt(start)
         end_dt = _to_dt(end)
-        # stream through pages
-        limit = 1000
-        offset = 0
-        rows = []
-        while True:
-            items = repo.list(start_dt, end_dt, severity, source, limit, offset)
-            if not items:
-                break
-            for l in items:
-                # Format timestamp as YYYY-MM-DD HH:MM:SS
-                timestamp_str = l.timestamp.strftime("%Y-%m-%d %H:%M:%S") if l.timestamp else ""
-                rows.append([timestamp_str, l.severity, l.source, l.message])
-            offset += limit
-        # write csv to tmp file
-        now = datetime.utcnow().strftime("%Y%m%d%H%M%S")
-        filename = f"logs_export_{now}.csv"
-        out_dir = os.getenv("EXPORT_DIR", "/tmp")
-        path = os.path.join(out_dir, filename)
-        os.makedirs(out_dir, exist_ok=True)
-        with open(path, "w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(["timestamp", "severity", "source", "message"])
-            writer.writerows(rows)
+        previous = job.meta.get("progress") if job is not None else None
+        total = previous["total_estimate"] if previous else _estimate_total(repo, start_dt, end_dt, severity, source, q)
+        progress = ExportProgress(job, total)
+        progress.save()
+        # Part outputs get their own suffix so the export sweeper leaves them alone until finalize has run
+        path = _export_path(export_format, compress) + (SEGMENT_SUFFIX if part else "")
+        # Rows are written to a temp file as they arrive and only renamed into place once complete,
+        # so a reader never sees a partial export. Under RQ its name depends only on the job id,
+        # which lets a retry of the same job find it and resume CSV output from the last checkpoint.
+        tmp_path = (os.path.join(os.path.dirname(path), f"logs_export_{job.id}{_export_extension(export_format, compress)}.part") if job else path + ".part")
+        try:
+            if export_format == "csv":
+                _write_csv_resumable(tmp_path, repo, (start_dt, end_dt, severity, source, q), compress, header, job, progress)
+            else:
+                batches = repo.stream(start_dt, end_dt, severity, source, EXPORT_BATCH_SIZE, q=q)
+                try:
+                    _write_columnar(tmp_path, progress.track(batches, tmp_path), export_format)
+                finally:
+                    batches.close()
+            os.replace(tmp_path, path)
+        except BaseException:
+            # Keep a checkpointed file for the retry; otherwise nothing can use it
+            resumable = export_format == "csv" and job is not None and (job.retries_left or 0) > 0
+            if not resumable and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        if job is not None:
+            job.meta.pop("checkpoint", None)
+        progress.bytes = os.path.getsize(path)
+        progress.save()
         return path
     finally:
         db.close()
-
-
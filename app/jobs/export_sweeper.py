@@ -0,0 +1,98 @@
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FILE_PREFIX = "logs_export_"
+# Finished outputs of a partitioned export's parts, waiting for the finalize job to concatenate them
+SEGMENT_SUFFIX = ".segment"
+# In-progress exports and segments are only ever removed by age
+_AGE_ONLY_SUFFIXES = (".part", SEGMENT_SUFFIX)
+
+
+def _remove(path: str) -> bool:
+    try:
+        os.remove(path)
+        return True
+    except FileNotFoundError:
+        # Another sweeper or a finalizer got there first
+        return False
+
+
+def sweep_exports(directory: str, max_bytes: int, max_age: float, now: Optional[float] = None) -> Dict[str, int]:
+    """Delete export files older than max_age seconds, then the oldest finished ones until the directory fits max_bytes.
+
+    In-progress `.part` files and part `.segment` files count towards the budget but are only removed once
+    stale: a running export keeps touching the former, and a pending finalize job still needs the latter.
+    """
+    now = time.time() if now is None else now
+    files = []
+    if os.path.isdir(directory):
+        for entry in os.scandir(directory):
+            if not entry.name.startswith(EXPORT_FILE_PREFIX) or not entry.is_file():
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+
+    removed = freed = 0
+    kept = []
+    for mtime, size, path in files:
+        if now - mtime > max_age:
+            if _remove(path):
+                removed += 1
+                freed += size
+        else:
+            kept.append((mtime, size, path))
+    total = sum(size for _, size, _ in kept)
+    for mtime, size, path in sorted(f for f in kept if not f[2].endswith(_AGE_ONLY_SUFFIXES)):
+        if total <= max_bytes:
+            break
+        if _remove(path):
+            removed += 1
+            freed += size
+        total -= size
+    return {"removed": removed, "freed_bytes": freed, "remaining_bytes": total}
+
+
+class ExportSweeper:
+    """Background thread running sweep_exports over EXPORT_DIR every `interval` seconds."""
+
+    def __init__(self, directory: str, interval: float):
+        self.directory = directory
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="export-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                result = sweep_exports(self.directory, settings.EXPORT_DIR_MAX_BYTES, settings.EXPORT_MAX_AGE)
+                if result["removed"]:
+                    logger.info("Evicted %d export files (%d bytes)", result["removed"], result["freed_bytes"])
+            except OSError:
+                logger.exception("Export sweep failed")
+            self._stop.wait(self.interval)
+
+
+if __name__ == "__main__":
+    print(sweep_exports(os.getenv("EXPORT_DIR", "/tmp"), settings.EXPORT_DIR_MAX_BYTES, settings.EXPORT_MAX_AGE))
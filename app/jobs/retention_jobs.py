@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.log_partition import drop_partitions_before, install_partitions, partitioning_enabled, period_start
+from app.repositories.log_dictionary_repository import LogDictionaryRepository
+from app.repositories.log_repository import LogRepository
+from app.repositories.log_rollup_repository import floor_bucket
+from app.services.query_cache import get_query_cache
+
+
+def apply_retention_job(now: Optional[datetime] = None) -> dict:
+    """Remove logs older than LOG_RETENTION_DAYS and the messages they alone used, and premake upcoming partitions; run it daily."""
+    now = now or datetime.now(timezone.utc)
+    db: Session = SessionLocal()
+    try:
+        connection = db.connection()
+        install_partitions(connection, now)
+        dropped = []
+        deleted = 0
+        deleted_messages = 0
+        if settings.LOG_RETENTION_DAYS > 0:
+            cutoff = now - timedelta(days=settings.LOG_RETENTION_DAYS)
+            if partitioning_enabled(connection):
+                # Whole partitions only; rows in the partition holding the cutoff wait for the next period
+                cutoff = period_start(cutoff, settings.LOG_PARTITIONING)
+                dropped = drop_partitions_before(connection, cutoff)
+            else:
+                cutoff = floor_bucket(cutoff)
+            db.commit()
+            # Without partitions this does all the work; with them it only clears stray rows in the default partition
+            deleted = LogRepository(db).delete_before(cutoff, settings.LOG_RETENTION_BATCH_SIZE)
+            # Messages only expired logs used; other processes drop them from their caches after LOG_DICTIONARY_CACHE_TTL
+            deleted_messages = LogDictionaryRepository(db).delete_unused_messages(settings.LOG_RETENTION_BATCH_SIZE)
+        db.commit()
+        cache = get_query_cache()
+        if cache is not None and (dropped or deleted):
+            cache.invalidate()
+        return {"dropped_partitions": dropped, "deleted_rows": deleted, "deleted_messages": deleted_messages}
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    print(apply_retention_job())
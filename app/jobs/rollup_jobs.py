@@ -0,0 +1,15 @@
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal
+from app.repositories.log_rollup_repository import LogRollupRepository
+
+
+def rebuild_rollups_job() -> None:
+    db: Session = SessionLocal()
+    try:
+        LogRollupRepository(db).rebuild()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    rebuild_rollups_job()
@@ -0,0 +1,27 @@
+from datetime import datetime, timezone
+from rq import SimpleWorker
+from redis import RedisError
+from app.core.metrics import record_job_duration
+
+
+class MetricsWorker(SimpleWorker):
+    """SimpleWorker that records each job's duration for /metrics."""
+
+    def handle_job_success(self, job, queue, *args, **kwargs):
+        super().handle_job_success(job, queue, *args, **kwargs)
+        self._record(job, "finished")
+
+    def handle_job_failure(self, job, queue, *args, **kwargs):
+        super().handle_job_failure(job, queue, *args, **kwargs)
+        self._record(job, "failed")
+
+    def _record(self, job, status: str) -> None:
+        if job.started_at is None:
+            return
+        ended = job.ended_at or datetime.now(timezone.utc).replace(tzinfo=job.started_at.tzinfo)
+        name = (job.func_name or "unknown").rsplit(".", 1)[-1]
+        try:
+            record_job_duration(self.connection, name, status, (ended - job.started_at).total_seconds())
+        except RedisError:
+            # Metrics must never fail a job
+            pass
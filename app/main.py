@@ -1,17 +1,52 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.exceptions import RequestValidationError
 from fastapi import HTTPException
-from app.core.database import Base, engine
+from starlette.concurrency import run_in_threadpool
+from redis import RedisError
+from app.core.database import Base, SessionLocal, engine
 import app.models.user
 import app.models.log
-from app.api import auth, logs, users
+import app.models.log_dictionary
+import app.models.log_rollup
+from app.models.log_search import install_search_index
+from app.models.log_partition import install_partitions
+from app.models.log_migration import migrate_legacy_logs
+from app.api import auth, internal, logs, logs_async, users
+from app.core import metrics
 from app.core.config import settings
+from app.core.redis_conn import get_redis
+from app.repositories.log_rollup_repository import LogRollupRepository
+from app.services.ingest_buffer import get_ingest_buffer
+from app.services.password_hasher import password_hasher
 
 Base.metadata.create_all(bind=engine)
+# Tables created before dictionary encoding are converted, and ones created before search get their index
+with engine.begin() as conn:
+    migrate_legacy_logs(conn)
+    install_search_index(conn)
+    install_partitions(conn)
+# Rollups start out empty on a database that already has logs, and aggregates would undercount until backfilled.
+# They are maintained whether or not reads use them, so this only matters once per database.
+with SessionLocal() as db:
+    LogRollupRepository(db).rebuild_if_empty()
 
-app = FastAPI(title=settings.PROJECT_NAME)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    buffer = get_ingest_buffer()
+    if buffer is not None:
+        buffer.start()
+    yield
+    if buffer is not None:
+        # Drain everything still pending before the process exits
+        await run_in_threadpool(buffer.stop)
+    await run_in_threadpool(password_hasher.shutdown)
+
+
+app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -20,10 +55,15 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Outermost, so latency includes every other middleware
+app.add_middleware(metrics.MetricsMiddleware)
 
 app.include_router(auth.router, prefix=f"{settings.API_V1_STR}/auth", tags=["Auth"])
 app.include_router(logs.router, prefix=f"{settings.API_V1_STR}/logs", tags=["Logs"])
+# The hot read/ingest endpoints come either as sync handlers or, with ASYNC_DB, as async ones
+app.include_router(logs_async.router if settings.ASYNC_DB else logs.core_router, prefix=f"{settings.API_V1_STR}/logs", tags=["Logs"])
 app.include_router(users.router, prefix=f"{settings.API_V1_STR}/users", tags=["Users"])
+app.include_router(internal.router, prefix=f"{settings.API_V1_STR}/internal", tags=["Internal"])
 
 @app.get("/")
 async def root():
@@ -45,6 +85,17 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "service": "log-api"}
 
+@app.get("/metrics", include_in_schema=False)
+def metrics_endpoint():
+    """Prometheus metrics for this process, plus the exports queue"""
+    try:
+        redis = get_redis()
+        extra = metrics.render_queue(redis, "exports") + metrics.render_job_durations(redis)
+        extra += ["# TYPE rq_up gauge", "rq_up 1"]
+    except RedisError:
+        extra = ["# TYPE rq_up gauge", "rq_up 0"]
+    return PlainTextResponse(metrics.render(extra), media_type="text/plain; version=0.0.4")
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     # Fallback handler for uncaught exceptions with consistent response
@@ -65,7 +116,7 @@ async def http_exception_handler(request: Request, exc: HTTPException):
     # Customize 404 message
     if exc.status_code == 404 and message == "Not Found":
         message = "Endpoint not found"
-    return JSONResponse(status_code=exc.status_code, content={
+    return JSONResponse(status_code=exc.status_code, headers=getattr(exc, "headers", None), content={
         "success": False,
         "message": message,
         "data": data,
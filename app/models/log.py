@@ -1,19 +1,34 @@
-from sqlalchemy import Column, Integer, String, DateTime, Index
+from datetime import datetime, timezone
+from sqlalchemy import Column, ForeignKey, Integer, DateTime, Index
 from sqlalchemy.sql import func
+from app.core.config import settings
 from app.core.database import Base
 
 
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
 class Log(Base):
     __tablename__ = "logs"
 
     id = Column(Integer, primary_key=True, index=True)
-    timestamp = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
-    severity = Column(String, nullable=False, index=True)
-    source = Column(String, nullable=False, index=True)
-    message = Column(String, nullable=False)
+    # Set client-side too so every row stores the same precision and keyset comparisons stay exact
+    timestamp = Column(DateTime(timezone=True), default=_utcnow, server_default=func.now(), nullable=False, index=True)
+    severity_id = Column(Integer, ForeignKey("log_severities.id"), nullable=False, index=True)
+    source_id = Column(Integer, ForeignKey("log_sources.id"), nullable=False, index=True)
+    message_id = Column(Integer, ForeignKey("log_messages.id"), nullable=False, index=True)
+
+    # Values behind the ids, filled in by LogRepository from the dictionary cache; not stored on the row
+    severity = None
+    source = None
+    message = None
 
     __table_args__ = (
-        Index("ix_logs_ts_sev_src", "timestamp", "severity", "source"),
+        Index("ix_logs_ts_sev_src", "timestamp", "severity_id", "source_id"),
+        Index("ix_logs_ts_id", "timestamp", "id"),
+        # Range-partitioned by time on Postgres when enabled (see app.models.log_partition); ignored elsewhere
+        {"postgresql_partition_by": "RANGE (timestamp)"} if settings.LOG_PARTITIONING in ("day", "month") else {},
     )
 
 
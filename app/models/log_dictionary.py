@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, String
+from app.core.database import Base
+
+# Interned values referenced by logs through small integer ids. Ids are never reused, so a cached
+# id -> value mapping can never point at a different value. Severities and sources are append-only;
+# messages no log refers to any more are pruned by the retention job.
+
+
+class LogSeverity(Base):
+    __tablename__ = "log_severities"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50), nullable=False, unique=True)
+
+
+class LogSource(Base):
+    __tablename__ = "log_sources"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(100), nullable=False, unique=True)
+
+
+class LogMessage(Base):
+    __tablename__ = "log_messages"
+
+    id = Column(Integer, primary_key=True)
+    message = Column(String, nullable=False)
+    # Unique on a digest rather than the text, which can exceed btree entry limits on Postgres
+    digest = Column(String(40), nullable=False, unique=True)
+
+    # Pruned ids must not be handed out again; SQLite would otherwise reuse the highest ones
+    __table_args__ = {"sqlite_autoincrement": True}
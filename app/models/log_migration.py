@@ -0,0 +1,72 @@
+from sqlalchemy import insert, inspect
+from sqlalchemy.engine import Connection
+from app.models.log import Log
+from app.models.log_dictionary import LogMessage
+from app.repositories.log_dictionary_repository import message_digest
+
+# Databases created before dictionary encoding keep severity, source and message as text on every logs row.
+# Such a table is rebuilt once in the current shape: the values are interned into the lookup tables and the
+# rows copied over with their ids, keeping the original log ids. The lookup tables themselves come from
+# create_all, which runs first.
+_LEGACY_TABLE = "logs_legacy"
+_BATCH_SIZE = 1000
+
+
+def _is_legacy(connection: Connection) -> bool:
+    inspector = inspect(connection)
+    if not inspector.has_table("logs"):
+        return False
+    columns = {column["name"] for column in inspector.get_columns("logs")}
+    return "severity" in columns and "severity_id" not in columns
+
+
+def migrate_legacy_logs(connection: Connection) -> bool:
+    """Move a text-column logs table onto the lookup tables; a no-op (returning False) once migrated."""
+    if connection.dialect.name == "postgresql":
+        # Every app process runs this at startup; the first one migrates, the rest wait and then see the new shape
+        connection.exec_driver_sql("SELECT pg_advisory_xact_lock(hashtext('migrate_legacy_logs'))")
+    if not _is_legacy(connection):
+        return False
+    quote = connection.dialect.identifier_preparer.quote
+    inspector = inspect(connection)
+    # Free the index and constraint names for the new table
+    for index in inspector.get_indexes("logs"):
+        connection.exec_driver_sql(f"DROP INDEX {quote(index['name'])}")
+    primary_key = inspector.get_pk_constraint("logs").get("name")
+    connection.exec_driver_sql(f"ALTER TABLE logs RENAME TO {_LEGACY_TABLE}")
+    if connection.dialect.name == "postgresql" and primary_key:
+        connection.exec_driver_sql(
+            f"ALTER TABLE {_LEGACY_TABLE} RENAME CONSTRAINT {quote(primary_key)} TO {_LEGACY_TABLE}_pkey"
+        )
+    Log.__table__.create(connection)
+
+    connection.exec_driver_sql(
+        f"INSERT INTO log_severities (name) SELECT DISTINCT severity FROM {_LEGACY_TABLE} "
+        "WHERE severity NOT IN (SELECT name FROM log_severities)"
+    )
+    connection.exec_driver_sql(
+        f"INSERT INTO log_sources (name) SELECT DISTINCT source FROM {_LEGACY_TABLE} "
+        "WHERE source NOT IN (SELECT name FROM log_sources)"
+    )
+    # Message digests are computed here rather than in SQL, which has no portable sha1
+    missing = [row[0] for row in connection.exec_driver_sql(
+        f"SELECT DISTINCT l.message FROM {_LEGACY_TABLE} l "
+        "LEFT JOIN log_messages m ON m.message = l.message WHERE m.id IS NULL"
+    )]
+    for offset in range(0, len(missing), _BATCH_SIZE):
+        batch = missing[offset:offset + _BATCH_SIZE]
+        connection.execute(insert(LogMessage.__table__), [{"message": m, "digest": message_digest(m)} for m in batch])
+
+    connection.exec_driver_sql(
+        "INSERT INTO logs (id, timestamp, severity_id, source_id, message_id) "
+        "SELECT l.id, l.timestamp, s.id, src.id, m.id "
+        f"FROM {_LEGACY_TABLE} l "
+        "JOIN log_severities s ON s.name = l.severity "
+        "JOIN log_sources src ON src.name = l.source "
+        "JOIN log_messages m ON m.message = l.message"
+    )
+    if connection.dialect.name == "postgresql":
+        # Ids were copied explicitly, so move the new sequence past them
+        connection.exec_driver_sql("SELECT setval(pg_get_serial_sequence('logs', 'id'), max(id)) FROM logs")
+    connection.exec_driver_sql(f"DROP TABLE {_LEGACY_TABLE}")
+    return True
@@ -0,0 +1,115 @@
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+from sqlalchemy import PrimaryKeyConstraint, event
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.compiler import compiles
+from app.core.config import settings
+from app.models.log import Log
+
+# Declarative range partitioning of logs by timestamp on Postgres (LOG_PARTITIONING=day|month).
+# Rows outside every premade partition land in logs_default so inserts never fail.
+_logs = Log.__table__
+PARTITION_PREFIX = "logs_p"
+DEFAULT_PARTITION = "logs_default"
+_NAME_FORMATS = {"day": "%Y%m%d", "month": "%Y%m"}
+
+
+def partitioning_enabled(connection: Connection) -> bool:
+    return connection.dialect.name == "postgresql" and settings.LOG_PARTITIONING in _NAME_FORMATS
+
+
+@compiles(PrimaryKeyConstraint, "postgresql")
+def _compile_primary_key(constraint, compiler, **kw):
+    # Unique constraints on a partitioned table must include the partition key; the ORM keeps `id` as the identity
+    if constraint.table is _logs and settings.LOG_PARTITIONING in _NAME_FORMATS:
+        return "PRIMARY KEY (id, timestamp)"
+    return compiler.visit_primary_key_constraint(constraint, **kw)
+
+
+def period_start(ts: datetime, granularity: str) -> datetime:
+    ts = ts.astimezone(timezone.utc) if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+    start = ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    return start.replace(day=1) if granularity == "month" else start
+
+
+def next_period(start: datetime, granularity: str) -> datetime:
+    if granularity == "month":
+        return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def partition_name(start: datetime, granularity: str) -> str:
+    return PARTITION_PREFIX + start.strftime(_NAME_FORMATS[granularity])
+
+
+def partition_bounds(name: str, granularity: str) -> Optional[Tuple[datetime, datetime]]:
+    # [start, end) of a partition from its name; None for the default partition or foreign tables
+    if not name.startswith(PARTITION_PREFIX):
+        return None
+    try:
+        start = datetime.strptime(name[len(PARTITION_PREFIX):], _NAME_FORMATS[granularity]).replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+    return start, next_period(start, granularity)
+
+
+def list_partitions(connection: Connection) -> List[str]:
+    rows = connection.exec_driver_sql(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = 'logs'::regclass ORDER BY c.relname"
+    )
+    return [r[0] for r in rows]
+
+
+def install_partitions(connection: Connection, now: Optional[datetime] = None, until: Optional[datetime] = None) -> None:
+    """Create the default partition and the current plus LOG_PARTITION_PREMAKE upcoming ones; idempotent.
+
+    With `until`, every period from `now` through `until` is created as well, e.g. before a backfill.
+    """
+    if not partitioning_enabled(connection):
+        return
+    granularity = settings.LOG_PARTITIONING
+    # App processes, seeders and the retention job may all run this at once
+    connection.exec_driver_sql("SELECT pg_advisory_xact_lock(hashtext('install_partitions'))")
+    connection.exec_driver_sql(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF logs DEFAULT")
+    start = period_start(now or datetime.now(timezone.utc), granularity)
+    last = period_start(until, granularity) if until else start
+    created = 0
+    while created <= settings.LOG_PARTITION_PREMAKE or start <= last:
+        created += 1
+        end = next_period(start, granularity)
+        _create_partition(connection, partition_name(start, granularity), start, end)
+        start = end
+
+
+def _create_partition(connection: Connection, name: str, start: datetime, end: datetime) -> None:
+    bounds = f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    if connection.exec_driver_sql(f"SELECT to_regclass('{name}')").scalar() is not None:
+        return
+    in_range = f"timestamp >= '{start.isoformat()}' AND timestamp < '{end.isoformat()}'"
+    if connection.exec_driver_sql(f"SELECT 1 FROM {DEFAULT_PARTITION} WHERE {in_range} LIMIT 1").first() is None:
+        connection.exec_driver_sql(f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF logs {bounds}")
+        return
+    # Rows already landed in the default partition for this period, and Postgres refuses a partition they
+    # would belong to. Move them into a standalone table first, then attach it (indexes are added on attach).
+    connection.exec_driver_sql(f"CREATE TABLE {name} (LIKE logs INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+    connection.exec_driver_sql(f"INSERT INTO {name} SELECT * FROM {DEFAULT_PARTITION} WHERE {in_range}")
+    connection.exec_driver_sql(f"DELETE FROM {DEFAULT_PARTITION} WHERE {in_range}")
+    connection.exec_driver_sql(f"ALTER TABLE logs ATTACH PARTITION {name} {bounds}")
+
+
+def drop_partitions_before(connection: Connection, cutoff: datetime) -> List[str]:
+    """Detach and drop every partition that ends at or before cutoff; cost does not depend on row count."""
+    dropped = []
+    for name in list_partitions(connection):
+        bounds = partition_bounds(name, settings.LOG_PARTITIONING)
+        if bounds and bounds[1] <= cutoff:
+            connection.exec_driver_sql(f"ALTER TABLE logs DETACH PARTITION {name}")
+            connection.exec_driver_sql(f"DROP TABLE {name}")
+            dropped.append(name)
+    return dropped
+
+
+@event.listens_for(_logs, "after_create")
+def _install_on_create(target, connection, **kw):
+    install_partitions(connection)
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from app.core.database import Base
+
+# Width of one rollup bucket; buckets start on whole minutes
+ROLLUP_BUCKET_SECONDS = 60
+
+
+class LogRollup(Base):
+    """Count of logs per minute bucket x severity x source, maintained alongside the logs table."""
+
+    __tablename__ = "log_rollups"
+
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+    severity = Column(String, primary_key=True)
+    source = Column(String, primary_key=True)
+    log_count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,100 @@
+from sqlalchemy import Boolean, event, literal
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+from app.models.log import Log
+from app.models.log_dictionary import LogMessage
+
+# Full-text index over the interned message texts: a GIN expression index on Postgres, an external-content
+# FTS5 table kept in sync by triggers on SQLite. Other backends fall back to LIKE. Each distinct message is
+# indexed once, and matches are joined back to logs through message_id.
+_logs = Log.__table__
+_messages = LogMessage.__table__
+
+_SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE log_messages_fts USING fts5(message, content='log_messages', content_rowid='id')",
+    """CREATE TRIGGER log_messages_fts_ai AFTER INSERT ON log_messages BEGIN
+        INSERT INTO log_messages_fts(rowid, message) VALUES (new.id, new.message);
+    END""",
+    """CREATE TRIGGER log_messages_fts_ad AFTER DELETE ON log_messages BEGIN
+        INSERT INTO log_messages_fts(log_messages_fts, rowid, message) VALUES ('delete', old.id, old.message);
+    END""",
+    """CREATE TRIGGER log_messages_fts_au AFTER UPDATE OF message ON log_messages BEGIN
+        INSERT INTO log_messages_fts(log_messages_fts, rowid, message) VALUES ('delete', old.id, old.message);
+        INSERT INTO log_messages_fts(rowid, message) VALUES (new.id, new.message);
+    END""",
+    # Index rows that existed before the FTS table
+    "INSERT INTO log_messages_fts(log_messages_fts) VALUES ('rebuild')",
+]
+
+_POSTGRES_DDL = "CREATE INDEX IF NOT EXISTS ix_log_messages_fts ON log_messages USING GIN (to_tsvector('simple', message))"
+
+
+def install_search_index(connection: Connection) -> None:
+    """Create the message search index if it is missing; safe to run on every startup."""
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        connection.exec_driver_sql(_POSTGRES_DDL)
+    elif dialect == "sqlite":
+        exists = connection.exec_driver_sql("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'log_messages_fts'").first()
+        if not exists:
+            for ddl in _SQLITE_DDL:
+                connection.exec_driver_sql(ddl)
+
+
+@event.listens_for(_messages, "after_create")
+def _install_on_create(target, connection, **kw):
+    install_search_index(connection)
+
+
+def _fts5_query(q: str) -> str:
+    # Quote every term so user input is never parsed as FTS5 query syntax; terms are ANDed
+    return " ".join('"' + term.replace('"', '""') + '"' for term in q.split())
+
+
+def _like_pattern(q: str) -> str:
+    escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+class message_match(FunctionElement):
+    """Boolean `log message matches q` rendered for the index available on each backend."""
+
+    type = Boolean()
+    inherit_cache = True
+    name = "message_match"
+
+    def __init__(self, q: str):
+        # Each backend wants the search text in a different shape; all are bound so statements stay cacheable
+        super().__init__(literal(q), literal(_fts5_query(q)), literal(_like_pattern(q)))
+
+
+@compiles(message_match)
+def _compile_default(element, compiler, **kw):
+    _, _, pattern = element.clauses.clauses
+    return "%s IN (SELECT %s FROM log_messages WHERE %s LIKE %s ESCAPE '\\')" % (
+        compiler.process(_logs.c.message_id, **kw),
+        compiler.process(_messages.c.id, **kw),
+        compiler.process(_messages.c.message, **kw),
+        compiler.process(pattern, **kw),
+    )
+
+
+@compiles(message_match, "postgresql")
+def _compile_postgresql(element, compiler, **kw):
+    q, _, _ = element.clauses.clauses
+    return "%s IN (SELECT %s FROM log_messages WHERE to_tsvector('simple', %s) @@ plainto_tsquery('simple', %s))" % (
+        compiler.process(_logs.c.message_id, **kw),
+        compiler.process(_messages.c.id, **kw),
+        compiler.process(_messages.c.message, **kw),
+        compiler.process(q, **kw),
+    )
+
+
+@compiles(message_match, "sqlite")
+def _compile_sqlite(element, compiler, **kw):
+    _, fts_query, _ = element.clauses.clauses
+    return "%s IN (SELECT rowid FROM log_messages_fts WHERE log_messages_fts MATCH %s)" % (
+        compiler.process(_logs.c.message_id, **kw),
+        compiler.process(fts_query, **kw),
+    )
@@ -0,0 +1,153 @@
+import hashlib
+from typing import Dict, Iterable, Optional
+from sqlalchemy import delete, event, exists, select
+from sqlalchemy.orm import Session
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import dialect_insert
+from app.models.log import Log
+from app.models.log_dictionary import LogMessage, LogSeverity, LogSource
+
+_PENDING = "log_dictionary_pending"
+
+
+def message_digest(message: str) -> str:
+    return hashlib.sha1(message.encode("utf-8")).hexdigest()
+
+
+class Dictionary:
+    """Process-wide id <-> value cache over one lookup table."""
+
+    def __init__(self, model, value_column: str, key_column: Optional[str] = None, key=None, ttl: Optional[float] = None):
+        self.table = model.__table__
+        self.value_column = value_column
+        # Column with the unique constraint; defaults to the value itself
+        self.key_column = key_column or value_column
+        self.key = key or (lambda value: value)
+        self.ids = TTLCache(maxsize=settings.LOG_DICTIONARY_CACHE_SIZE, ttl=ttl)
+        self.values = TTLCache(maxsize=settings.LOG_DICTIONARY_CACHE_SIZE, ttl=ttl)
+
+    def remember(self, entry_id: int, value: str) -> None:
+        self.ids.set(value, entry_id)
+        self.values.set(entry_id, value)
+
+    def forget(self, entry_id: int, value: str) -> None:
+        self.ids.delete(value)
+        self.values.delete(entry_id)
+
+    def row(self, value: str) -> dict:
+        return {self.value_column: value, self.key_column: self.key(value)}
+
+
+severities = Dictionary(LogSeverity, "name")
+sources = Dictionary(LogSource, "name")
+# Other processes only drop pruned messages when their entries expire
+messages = Dictionary(LogMessage, "message", "digest", message_digest, ttl=settings.LOG_DICTIONARY_CACHE_TTL)
+
+
+class LogDictionaryRepository:
+    """Interns values into the lookup tables and resolves ids back, going to the database only on cache misses.
+
+    Entries inserted by the current transaction are kept on the session and only published to the
+    process-wide cache once it commits, so a rolled-back id is never handed out.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _pending(self, kind: Dictionary) -> Dict[str, int]:
+        return self.db.info.setdefault(_PENDING, {}).setdefault(kind, {})
+
+    def intern(self, kind: Dictionary, values: Iterable[str]) -> Dict[str, int]:
+        pending = self._pending(kind)
+        result: Dict[str, int] = {}
+        missing = []
+        for value in set(values):
+            entry_id = kind.ids.get(value)
+            if entry_id is None:
+                entry_id = pending.get(value)
+            if entry_id is None:
+                missing.append(value)
+            else:
+                result[value] = entry_id
+        if not missing:
+            return result
+
+        table = kind.table
+        stmt = dialect_insert(self.db, table).on_conflict_do_nothing(index_elements=[table.c[kind.key_column]])
+        stmt = stmt.returning(table.c.id, table.c[kind.value_column])
+        # Insert in a fixed order so concurrent writers lock the unique keys in the same order and cannot deadlock
+        for entry_id, value in self.db.execute(stmt, [kind.row(value) for value in sorted(missing)]):
+            pending[value] = entry_id
+            result[value] = entry_id
+        # The rest were committed by someone else, so they are safe to cache right away
+        existing = [value for value in missing if value not in result]
+        if existing:
+            for entry_id, value in self._select(kind, table.c[kind.key_column].in_([kind.key(v) for v in existing])):
+                kind.remember(entry_id, value)
+                result[value] = entry_id
+        return result
+
+    def lookup(self, kind: Dictionary, value: str) -> Optional[int]:
+        # Id of an existing entry without creating one; used for filters
+        entry_id = kind.ids.get(value)
+        if entry_id is None:
+            entry_id = self._pending(kind).get(value)
+        if entry_id is None:
+            for entry_id, stored in self._select(kind, kind.table.c[kind.key_column] == kind.key(value)):
+                kind.remember(entry_id, stored)
+        return entry_id
+
+    def resolve(self, kind: Dictionary, ids: Iterable[int]) -> Dict[int, str]:
+        pending = {entry_id: value for value, entry_id in self._pending(kind).items()}
+        result: Dict[int, str] = {}
+        missing = []
+        for entry_id in set(ids):
+            value = kind.values.get(entry_id)
+            if value is None:
+                value = pending.get(entry_id)
+            if value is None:
+                missing.append(entry_id)
+            else:
+                result[entry_id] = value
+        if missing:
+            for entry_id, value in self._select(kind, kind.table.c.id.in_(missing)):
+                kind.remember(entry_id, value)
+                result[entry_id] = value
+        return result
+
+    def delete_unused_messages(self, batch_size: int) -> int:
+        """Delete messages no log refers to any more, in short batches; returns how many were removed."""
+        table = messages.table
+        unused = ~exists().where(Log.message_id == table.c.id)
+        deleted = 0
+        while True:
+            rows = self.db.execute(select(table.c.id, table.c.message).where(unused).limit(batch_size)).all()
+            if not rows:
+                break
+            # Checked again on delete, in case a log started using one of them in the meantime
+            result = self.db.execute(delete(table).where(table.c.id.in_([entry_id for entry_id, _ in rows]), unused))
+            self.db.commit()
+            for entry_id, value in rows:
+                messages.forget(entry_id, value)
+            deleted += result.rowcount
+            if len(rows) < batch_size:
+                break
+        return deleted
+
+    def _select(self, kind: Dictionary, clause):
+        return self.db.execute(select(kind.table.c.id, kind.table.c[kind.value_column]).where(clause)).all()
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending(session: Session) -> None:
+    for kind, entries in session.info.pop(_PENDING, {}).items():
+        for value, entry_id in entries.items():
+            kind.remember(entry_id, value)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_pending(session: Session, transaction) -> None:
+    # Runs after after_commit, so anything left here belongs to a rolled-back transaction
+    if transaction.parent is None:
+        session.info.pop(_PENDING, None)
@@ -1,78 +1,310 @@
+import csv
+import io
+import json
+from collections import Counter, namedtuple
 from sqlalchemy.orm import Session
-from sqlalchemy import select, func
+from sqlalchemy import select, func, insert, delete, or_, and_, false
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar
+from app.core import metrics
+from app.core.config import settings
 from app.models.log import Log
+from app.models.log_search import message_match
+from app.repositories.log_dictionary_repository import LogDictionaryRepository, messages, severities, sources
+from app.repositories.log_rollup_repository import (
+    LogRollupRepository,
+    RollupKey,
+    ceil_bucket,
+    floor_bucket,
+    epoch_bucket_expr,
+    group_key,
+)
+
+# A log row with its dictionary ids resolved back to values, as returned by LogRepository.list and stream
+LogRow = namedtuple("LogRow", ["id", "timestamp", "severity", "source", "message"])
+
+class explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) of a statement, with its parameters bound in the driver's own paramstyle."""
+
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+_GROUP_COLUMNS = {"severity": (Log.severity_id, severities), "source": (Log.source_id, sources)}
+
+
+def _apply_filters(stmt, start: Optional[datetime], end: Optional[datetime], severity_id: Optional[int], source_id: Optional[int], q: Optional[str] = None):
+    if start:
+        stmt = stmt.where(Log.timestamp >= start)
+    if end:
+        stmt = stmt.where(Log.timestamp <= end)
+    if severity_id is not None:
+        stmt = stmt.where(Log.severity_id == severity_id)
+    if source_id is not None:
+        stmt = stmt.where(Log.source_id == source_id)
+    # Whitespace-only searches have no terms and match everything, like no search at all
+    q = " ".join(q.split()) if q else None
+    if q:
+        stmt = stmt.where(message_match(q))
+    return stmt
+
+
+def _after_cursor(stmt, cursor: Optional[Tuple[datetime, int]]):
+    # Keyset predicate for the (timestamp desc, id desc) order; the plain upper bound lets
+    # time-partitioned tables skip partitions newer than the cursor
+    if cursor is None:
+        return stmt
+    ts, log_id = cursor
+    return stmt.where(Log.timestamp <= ts, or_(Log.timestamp < ts, and_(Log.timestamp == ts, Log.id < log_id)))
 
 
 class LogRepository:
     def __init__(self, db: Session):
         self.db = db
+        self.rollups = LogRollupRepository(db)
+        self.dictionary = LogDictionaryRepository(db)
+
+    def _filter(self, stmt, start: Optional[datetime], end: Optional[datetime], severity: Optional[str], source: Optional[str], q: Optional[str] = None):
+        # Filter values are matched by id; a value that was never interned cannot match any row
+        severity_id = self.dictionary.lookup(severities, severity) if severity else None
+        source_id = self.dictionary.lookup(sources, source) if source else None
+        if (severity and severity_id is None) or (source and source_id is None):
+            return stmt.where(false())
+        return _apply_filters(stmt, start, end, severity_id, source_id, q)
+
+    def _encode(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Swap severity/source/message for their dictionary ids, interning new values
+        severity_ids = self.dictionary.intern(severities, (row["severity"] for row in rows))
+        source_ids = self.dictionary.intern(sources, (row["source"] for row in rows))
+        message_ids = self.dictionary.intern(messages, (row["message"] for row in rows))
+        encoded = []
+        for row in rows:
+            values = {k: v for k, v in row.items() if k not in ("severity", "source", "message")}
+            values["severity_id"] = severity_ids[row["severity"]]
+            values["source_id"] = source_ids[row["source"]]
+            values["message_id"] = message_ids[row["message"]]
+            encoded.append(values)
+        return encoded
+
+    def _hydrate(self, logs: List[Log]) -> List[Log]:
+        severity_names = self.dictionary.resolve(severities, (log.severity_id for log in logs))
+        source_names = self.dictionary.resolve(sources, (log.source_id for log in logs))
+        message_texts = self.dictionary.resolve(messages, (log.message_id for log in logs))
+        for log in logs:
+            log.severity = severity_names[log.severity_id]
+            log.source = source_names[log.source_id]
+            log.message = message_texts[log.message_id]
+        return logs
+
+    def _decode_rows(self, rows) -> List[LogRow]:
+        severity_names = self.dictionary.resolve(severities, (r.severity_id for r in rows))
+        source_names = self.dictionary.resolve(sources, (r.source_id for r in rows))
+        message_texts = self.dictionary.resolve(messages, (r.message_id for r in rows))
+        return [
+            LogRow(r.id, r.timestamp, severity_names[r.severity_id], source_names[r.source_id], message_texts[r.message_id])
+            for r in rows
+        ]
+
+    def _track(self, deltas: Dict[RollupKey, int]) -> None:
+        # Rollup counts change in the same transaction as the rows they describe. They are kept even while
+        # LOG_ROLLUPS_ENABLED is off, so turning reads from them back on never serves stale counts.
+        self.rollups.add(deltas)
 
     def create(self, severity: str, source: str, message: str) -> Log:
-        log = Log(severity=severity, source=source, message=message)
+        log = Log(**self._encode([{"severity": severity, "source": source, "message": message}])[0])
+        log.severity, log.source, log.message = severity, source, message
         self.db.add(log)
+        self.db.flush()
+        self._track({(floor_bucket(log.timestamp), severity, source): 1})
         self.db.commit()
+        metrics.log_rows_ingested.inc()
         self.db.refresh(log)
         return log
 
+    def bulk_create(self, rows: List[Dict[str, Any]]) -> List[int]:
+        # Single multi-row INSERT ... RETURNING in one transaction; ids come back in input order
+        stmt = insert(Log).returning(Log.id, Log.timestamp, sort_by_parameter_order=True)
+        inserted = self.db.execute(stmt, self._encode(rows)).all()
+        self._track(Counter((floor_bucket(r.timestamp), row["severity"], row["source"]) for r, row in zip(inserted, rows)))
+        self.db.commit()
+        metrics.log_rows_ingested.inc(amount=len(inserted))
+        return [r.id for r in inserted]
+
+    def bulk_load(self, rows: List[Dict[str, Any]]) -> int:
+        # Seeding fast path: COPY on psycopg2, a plain executemany elsewhere. Rollups are not tracked;
+        # rebuild them once the load is done
+        encoded = self._encode(rows)
+        bind = self.db.get_bind()
+        if bind.dialect.name == "postgresql" and bind.dialect.driver == "psycopg2":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for row in encoded:
+                writer.writerow((row["timestamp"].isoformat(), row["severity_id"], row["source_id"], row["message_id"]))
+            buffer.seek(0)
+            with self.db.connection().connection.cursor() as cursor:
+                cursor.copy_expert("COPY logs (timestamp, severity_id, source_id, message_id) FROM STDIN WITH (FORMAT csv)", buffer)
+        else:
+            self.db.execute(insert(Log.__table__), encoded)
+        self.db.commit()
+        metrics.log_rows_ingested.inc(amount=len(encoded))
+        return len(encoded)
+
     def get(self, log_id: int) -> Optional[Log]:
-        return self.db.get(Log, log_id)
+        log = self.db.get(Log, log_id)
+        return self._hydrate([log])[0] if log else None
 
-    def list(self, start: Optional[datetime], end: Optional[datetime], severity: Optional[str], source: Optional[str], limit: int, offset: int) -> List[Log]:
-        stmt = select(Log)
-        if start:
-            stmt = stmt.where(Log.timestamp >= start)
-        if end:
-            stmt = stmt.where(Log.timestamp <= end)
-        if severity:
-            stmt = stmt.where(Log.severity == severity)
-        if source:
-            stmt = stmt.where(Log.source == source)
-        stmt = stmt.order_by(Log.timestamp.desc()).limit(limit).offset(offset)
-        return list(self.db.execute(stmt).scalars().all())
-
-    def count(self, start: Optional[datetime], end: Optional[datetime], severity: Optional[str], source: Optional[str]) -> int:
-        stmt = select(func.count()).select_from(Log)
-        if start:
-            stmt = stmt.where(Log.timestamp >= start)
-        if end:
-            stmt = stmt.where(Log.timestamp <= end)
-        if severity:
-            stmt = stmt.where(Log.severity == severity)
-        if source:
-            stmt = stmt.where(Log.source == source)
+    def list(self, start: Optional[datetime], end: Optional[datetime], severity: Optional[str], source: Optional[str], limit: int, offset: int, cursor: Optional[Tuple[datetime, int]] = None, q: Optional[str] = None) -> List[LogRow]:
+        # Plain column tuples: pages are read-only, so ORM instances and the identity map are pure overhead
+        stmt = select(Log.id, Log.timestamp, Log.severity_id, Log.source_id, Log.message_id)
+        stmt = _after_cursor(self._filter(stmt, start, end, severity, source, q), cursor)
+        stmt = stmt.order_by(Log.timestamp.desc(), Log.id.desc()).limit(limit).offset(offset)
+        return self._decode_rows(self.db.execute(stmt).all())
+
+    def stream(self, start: Optional[datetime], end: Optional[datetime], severity: Optional[str], source: Optional[str], batch_size: int = 1000, cursor: Optional[Tuple[datetime, int]] = None, q: Optional[str] = None) -> Iterator[list]:
+        # Server-side cursor (where the driver supports it) yielding plain LogRows in batches,
+        # so memory stays bounded by batch_size and no ORM identity map builds up
+        stmt = select(Log.id, Log.timestamp, Log.severity_id, Log.source_id, Log.message_id)
+        stmt = _after_cursor(self._filter(stmt, start, end, severity, source, q), cursor)
+        stmt = stmt.order_by(Log.timestamp.desc(), Log.id.desc()).execution_options(yield_per=batch_size)
+        result = self.db.execute(stmt)
+        try:
+            for batch in result.partitions():
+                yield self._decode_rows(batch)
+        finally:
+            result.close()
+
+    def count(self, start: Optional[datetime], end: Optional[datetime], severity: Optional[str], source: Optional[str], q: Optional[str] = None) -> int:
+        stmt = self._filter(select(func.count()).select_from(Log), start, end, severity, source, q)
         return self.db.execute(stmt).scalar() or 0
 
+    def time_bounds(self, start: Optional[datetime], end: Optional[datetime], severity: Optional[str], source: Optional[str], q: Optional[str] = None) -> Tuple[Optional[datetime], Optional[datetime]]:
+        stmt = self._filter(select(func.min(Log.timestamp), func.max(Log.timestamp)), start, end, severity, source, q)
+        lo, hi = self.db.execute(stmt).one()
+        return lo, hi
+
+    def count_capped(self, start: Optional[datetime], end: Optional[datetime], severity: Optional[str], source: Optional[str], cap: int, q: Optional[str] = None) -> int:
+        # Stops scanning after cap + 1 matches, so the cost is bounded regardless of range size
+        matches = self._filter(select(Log.id), start, end, severity, source, q).limit(cap + 1).subquery()
+        return self.db.execute(select(func.count()).select_from(matches)).scalar() or 0
+
+    def estimate_count(self, start: Optional[datetime], end: Optional[datetime], severity: Optional[str], source: Optional[str], q: Optional[str] = None) -> Optional[int]:
+        # Planner row estimate from table statistics; only available on Postgres
+        bind = self.db.get_bind()
+        if bind.dialect.name != "postgresql":
+            return None
+        plan = self.db.execute(explain(self._filter(select(Log.id), start, end, severity, source, q))).scalar()
+        # psycopg2 decodes the json column, asyncpg hands back the text
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
     def update(self, log: Log, severity: Optional[str], source: Optional[str], message: Optional[str]) -> Log:
+        old_key = (floor_bucket(log.timestamp), log.severity, log.source)
         if severity is not None:
+            log.severity_id = self.dictionary.intern(severities, [severity])[severity]
             log.severity = severity
         if source is not None:
+            log.source_id = self.dictionary.intern(sources, [source])[source]
             log.source = source
         if message is not None:
+            log.message_id = self.dictionary.intern(messages, [message])[message]
             log.message = message
+        new_key = (old_key[0], log.severity, log.source)
+        if new_key != old_key:
+            self._track({old_key: -1, new_key: 1})
         self.db.add(log)
         self.db.commit()
         self.db.refresh(log)
         return log
 
     def delete(self, log: Log) -> None:
+        self._track({(floor_bucket(log.timestamp), log.severity, log.source): -1})
         self.db.delete(log)
         self.db.commit()
 
+    def delete_before(self, cutoff: datetime, batch_size: int) -> int:
+        # Deletes in short id-bounded transactions so no single statement holds locks on a huge range;
+        # rollup buckets before cutoff are removed with them, so cutoff should fall on a bucket boundary
+        deleted = 0
+        while True:
+            ids = self.db.execute(select(Log.id).where(Log.timestamp < cutoff).limit(batch_size)).scalars().all()
+            if not ids:
+                break
+            self.db.execute(delete(Log).where(Log.id.in_(ids)))
+            self.db.commit()
+            deleted += len(ids)
+        self.rollups.delete_before(cutoff)
+        self.db.commit()
+        return deleted
+
     def aggregate(self, start: Optional[datetime], end: Optional[datetime], severity: Optional[str], source: Optional[str], by: str):
         if by not in {"severity", "source"}:
             raise ValueError("Invalid aggregate field")
-        column = Log.severity if by == "severity" else Log.source
-        stmt = select(column.label("key"), func.count().label("count"))
-        if start:
-            stmt = stmt.where(Log.timestamp >= start)
-        if end:
-            stmt = stmt.where(Log.timestamp <= end)
-        if severity:
-            stmt = stmt.where(Log.severity == severity)
-        if source:
-            stmt = stmt.where(Log.source == source)
-        stmt = stmt.group_by(column).order_by(func.count().desc())
+        counts = self._grouped_counts(start, end, severity, source, (by,))
+        return [{"key": key[0], "count": n} for key, n in counts.most_common() if n > 0]
+
+    def histogram(self, start: Optional[datetime], end: Optional[datetime], severity: Optional[str], source: Optional[str], interval: int, split: Optional[str]) -> Counter:
+        # Counts keyed by (bucket epoch,) or (bucket epoch, split value); empty buckets are absent
+        if split not in (None, "severity", "source"):
+            raise ValueError("Invalid histogram split")
+        return self._grouped_counts(start, end, severity, source, (split,) if split else (), interval)
+
+    def _raw_counts(self, start: Optional[datetime], end: Optional[datetime], severity: Optional[str], source: Optional[str], keys: Sequence[str], interval: Optional[int], *clauses) -> Counter:
+        columns = [_GROUP_COLUMNS[key][0] for key in keys]
+        if interval:
+            columns.insert(0, epoch_bucket_expr(Log.timestamp, interval, self.db.get_bind().dialect.name))
+        stmt = self._filter(select(*columns, func.count()), start, end, severity, source).where(*clauses).group_by(*columns)
         rows = self.db.execute(stmt).all()
-        return [{"key": r.key, "count": r.count} for r in rows]
+        # Group ids are translated back to values after grouping, so only the distinct ids are resolved
+        offset = 1 if interval else 0
+        names = [self.dictionary.resolve(_GROUP_COLUMNS[key][1], (row[offset + i] for row in rows)) for i, key in enumerate(keys)]
+        counts = Counter()
+        for row in rows:
+            values = list(row[:-1])
+            for i, lookup in enumerate(names):
+                values[offset + i] = lookup[values[offset + i]]
+            counts[group_key(tuple(values), interval)] = row[-1]
+        return counts
+
+    def _grouped_counts(self, start: Optional[datetime], end: Optional[datetime], severity: Optional[str], source: Optional[str], keys: Sequence[str], interval: Optional[int] = None) -> Counter:
+        if not settings.LOG_ROLLUPS_ENABLED:
+            return self._raw_counts(start, end, severity, source, keys, interval)
+        # Whole buckets come from the rollups; only the partial buckets at either edge touch raw rows.
+        # Every supported interval is a multiple of the rollup bucket, so rollup buckets never straddle two intervals
+        lo = ceil_bucket(start) if start else None
+        hi = floor_bucket(end) if end else None
+        if lo is not None and hi is not None and lo >= hi:
+            return self._raw_counts(start, end, severity, source, keys, interval)
+        counts = self.rollups.counts(lo, hi, severity, source, keys, interval)
+        if start and start < lo:
+            counts.update(self._raw_counts(start, None, severity, source, keys, interval, Log.timestamp < lo))
+        if end:
+            counts.update(self._raw_counts(hi, end, severity, source, keys, interval))
+        return counts
+
+
+T = TypeVar("T")
+
+
+class AsyncLogRepository:
+    """LogRepository over an AsyncSession.
+
+    run_sync hands the callable a LogRepository bound to the session's sync facade; its queries are
+    executed by the async driver on the event loop (SQLAlchemy bridges them with greenlets), so no
+    thread is held while waiting on the database and all the query logic stays in one place.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    async def run_sync(self, fn: Callable[[LogRepository], T]) -> T:
+        return await self.db.run_sync(lambda session: fn(LogRepository(session)))
@@ -0,0 +1,121 @@
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Sequence, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import select, func, delete, insert, cast, extract, text, Integer
+from app.core.database import dialect_insert
+from app.models.log import Log
+from app.models.log_dictionary import LogSeverity, LogSource
+from app.models.log_rollup import LogRollup, ROLLUP_BUCKET_SECONDS
+
+RollupKey = Tuple[datetime, str, str]
+
+
+def floor_bucket(ts: datetime) -> datetime:
+    return ts.replace(second=0, microsecond=0)
+
+
+def ceil_bucket(ts: datetime) -> datetime:
+    floored = floor_bucket(ts)
+    return floored if floored == ts else floored + timedelta(seconds=ROLLUP_BUCKET_SECONDS)
+
+
+def epoch_bucket_expr(column, interval: int, dialect_name: str):
+    # Start of the interval-wide bucket containing column, as UTC epoch seconds
+    if dialect_name == "postgresql":
+        return func.floor(extract("epoch", column) / interval) * interval
+    if dialect_name == "sqlite":
+        return cast(func.strftime("%s", column), Integer) // interval * interval
+    raise NotImplementedError(f"Time buckets are not supported on {dialect_name}")
+
+
+def _bucket_expr(dialect_name: str):
+    # Truncate log timestamps to the rollup bucket in SQL, matching how each backend stores DateTime
+    if dialect_name == "postgresql":
+        return func.date_trunc("minute", Log.timestamp)
+    if dialect_name == "sqlite":
+        return func.strftime("%Y-%m-%d %H:%M:00.000000", Log.timestamp)
+    raise NotImplementedError(f"Rollups are not supported on {dialect_name}")
+
+
+def group_key(values: tuple, interval: Optional[int]) -> tuple:
+    # Epoch buckets can come back as Decimal or float depending on the backend
+    if interval:
+        return (int(values[0]),) + tuple(values[1:])
+    return tuple(values)
+
+
+class LogRollupRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def add(self, deltas: Dict[RollupKey, int]) -> None:
+        # Applies count deltas in the caller's transaction; commits are left to the caller
+        rows = [
+            {"bucket_start": bucket, "severity": severity, "source": source, "log_count": n}
+            for (bucket, severity, source), n in deltas.items()
+            if n
+        ]
+        if not rows:
+            return
+        table = LogRollup.__table__
+        stmt = dialect_insert(self.db, table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.bucket_start, table.c.severity, table.c.source],
+            set_={"log_count": table.c.log_count + stmt.excluded.log_count},
+        )
+        self.db.execute(stmt, rows)
+
+    def counts(
+        self,
+        lo: Optional[datetime],
+        hi: Optional[datetime],
+        severity: Optional[str],
+        source: Optional[str],
+        keys: Sequence[str],
+        interval: Optional[int] = None,
+    ) -> Counter:
+        # Sums whole buckets in [lo, hi), grouped by the key columns and optionally an epoch bucket of `interval` seconds
+        columns = [getattr(LogRollup, key) for key in keys]
+        if interval:
+            columns.insert(0, epoch_bucket_expr(LogRollup.bucket_start, interval, self.db.get_bind().dialect.name))
+        stmt = select(*columns, func.sum(LogRollup.log_count)).group_by(*columns)
+        if lo is not None:
+            stmt = stmt.where(LogRollup.bucket_start >= lo)
+        if hi is not None:
+            stmt = stmt.where(LogRollup.bucket_start < hi)
+        if severity:
+            stmt = stmt.where(LogRollup.severity == severity)
+        if source:
+            stmt = stmt.where(LogRollup.source == source)
+        return Counter({group_key(row[:-1], interval): int(row[-1]) for row in self.db.execute(stmt).all()})
+
+    def delete_before(self, cutoff: datetime) -> None:
+        self.db.execute(delete(LogRollup).where(LogRollup.bucket_start < cutoff))
+
+    def rebuild(self) -> None:
+        # Recomputes every bucket from the raw logs, e.g. after enabling rollups on an existing database
+        bucket = _bucket_expr(self.db.get_bind().dialect.name)
+        source_rows = (
+            select(bucket, LogSeverity.name, LogSource.name, func.count())
+            .select_from(Log)
+            .join(LogSeverity, LogSeverity.id == Log.severity_id)
+            .join(LogSource, LogSource.id == Log.source_id)
+            .group_by(bucket, LogSeverity.name, LogSource.name)
+        )
+        self.db.execute(delete(LogRollup))
+        self.db.execute(insert(LogRollup).from_select(["bucket_start", "severity", "source", "log_count"], source_rows))
+        self.db.commit()
+
+    def rebuild_if_empty(self) -> bool:
+        """Backfill rollups for logs written before they were enabled; a no-op once any bucket exists."""
+        if self.db.get_bind().dialect.name == "postgresql":
+            # Every app process runs this at startup; the first one rebuilds, the rest then find buckets
+            self.db.execute(text("SELECT pg_advisory_xact_lock(hashtext('log_rollups_rebuild'))"))
+        has_rollups = self.db.execute(select(LogRollup.bucket_start).limit(1)).first() is not None
+        has_logs = self.db.execute(select(Log.id).limit(1)).first() is not None
+        if has_rollups or not has_logs:
+            self.db.rollback()
+            return False
+        self.rebuild()
+        return True
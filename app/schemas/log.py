@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 from datetime import datetime
+from app.core.config import settings
 
 
 class LogCreate(BaseModel):
@@ -9,6 +10,11 @@ class LogCreate(BaseModel):
 	message: str = Field(min_length=1, max_length=1000)
 
 
+class LogBatchCreate(BaseModel):
+	# Items stay raw so one bad entry is reported per index instead of rejecting the whole batch
+	items: List[Dict[str, Any]] = Field(min_length=1, max_length=settings.LOG_BATCH_MAX_ITEMS)
+
+
 class LogUpdate(BaseModel):
 	severity: Optional[str] = Field(default=None, min_length=1, max_length=50)
 	source: Optional[str] = Field(default=None, min_length=1, max_length=100)
@@ -1,12 +1,21 @@
 import argparse
+import math
+import multiprocessing
 import random
-from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Sequence
 from sqlalchemy.orm import Session
 from app.core.database import SessionLocal, Base, engine
 import app.models.user  
 import app.models.log  
+import app.models.log_dictionary
+import app.models.log_rollup
+from app.models.log_partition import install_partitions
 from app.repositories.user_repository import UserRepository
 from app.repositories.log_repository import LogRepository
+from app.repositories.log_rollup_repository import LogRollupRepository
+from app.repositories import log_dictionary_repository as dictionaries
 from app.core import security
 
 SEVERITIES = ["DEBUG", "INFO", "WARNING", "ERROR"]
@@ -25,7 +34,142 @@ MESSAGES = [
 	"Permission denied",
 ]
 
-def seed_data(admin_password: str, log_count: int):
+# Bulk mode defaults: mostly INFO, and sources in Zipf-like skew (the n-th is 1/n as busy as the first)
+DEFAULT_SEVERITY_WEIGHTS = {"DEBUG": 20, "INFO": 65, "WARNING": 10, "ERROR": 5}
+DEFAULT_SOURCE_WEIGHTS = {source: 1 / (rank + 1) for rank, source in enumerate(SOURCES)}
+# Messages containing {n} get a number from this range, which bounds the number of distinct messages
+MESSAGE_PARAM_RANGE = 5000
+
+
+def parse_weights(spec: str) -> Dict[str, float]:
+	"""Parse "INFO=65,ERROR=5" into {"INFO": 65.0, "ERROR": 5.0}."""
+	weights = {}
+	for part in spec.split(","):
+		name, sep, weight = part.partition("=")
+		if not sep or not name.strip():
+			raise argparse.ArgumentTypeError(f"Expected NAME=WEIGHT, got {part!r}")
+		try:
+			weights[name.strip()] = float(weight)
+		except ValueError:
+			raise argparse.ArgumentTypeError(f"Weight for {name.strip()!r} is not a number: {weight!r}")
+	return weights
+
+
+def _diurnal_weight(ts: datetime) -> float:
+	# Traffic peaks mid-afternoon UTC and bottoms out around 03:00 at a fifth of the peak
+	hour = ts.hour + ts.minute / 60
+	return 0.6 + 0.4 * math.cos((hour - 15) / 24 * 2 * math.pi)
+
+
+def generate_rows(
+	count: int,
+	start: datetime,
+	end: datetime,
+	severity_weights: Dict[str, float],
+	source_weights: Dict[str, float],
+	messages: Sequence[str],
+	seed: int,
+	batch_size: int,
+) -> Iterator[List[Dict[str, Any]]]:
+	"""Yield batches of synthetic log rows in time order between start and end; same arguments, same rows."""
+	rng = random.Random(seed)
+	span = (end - start).total_seconds()
+	severities, severity_cum = list(severity_weights), list(severity_weights.values())
+	sources, source_cum = list(source_weights), list(source_weights.values())
+	for offset in range(0, count, batch_size):
+		size = min(batch_size, count - offset)
+		lo = span * offset / count
+		width = span * size / count
+		timestamps = []
+		while len(timestamps) < size:
+			ts = start + timedelta(seconds=lo + rng.random() * width)
+			if rng.random() < _diurnal_weight(ts):
+				timestamps.append(ts)
+		timestamps.sort()
+		batch_severities = rng.choices(severities, severity_cum, k=size)
+		batch_sources = rng.choices(sources, source_cum, k=size)
+		batch = []
+		for ts, severity, source in zip(timestamps, batch_severities, batch_sources):
+			template = rng.choice(messages)
+			message = template.format(n=rng.randrange(MESSAGE_PARAM_RANGE)) if "{n}" in template else template
+			batch.append({"timestamp": ts, "severity": severity, "source": source, "message": message})
+		yield batch
+
+
+def _preintern(shard: Dict[str, Any]) -> None:
+	db: Session = SessionLocal()
+	try:
+		dictionary = dictionaries.LogDictionaryRepository(db)
+		dictionary.intern(dictionaries.severities, shard["severity_weights"])
+		dictionary.intern(dictionaries.sources, shard["source_weights"])
+		dictionary.intern(dictionaries.messages, [m for m in shard["messages"] if "{n}" not in m])
+		db.commit()
+	finally:
+		db.close()
+
+
+def _seed_shard(shard: Dict[str, Any]) -> int:
+	# Runs in a worker process with its own engine; each shard covers its own slice of time
+	db: Session = SessionLocal()
+	try:
+		repo = LogRepository(db)
+		loaded = 0
+		for batch in generate_rows(**shard):
+			loaded += repo.bulk_load(batch)
+		return loaded
+	finally:
+		db.close()
+
+
+def bulk_seed(
+	count: int,
+	start: datetime,
+	end: datetime,
+	severity_weights: Optional[Dict[str, float]] = None,
+	source_weights: Optional[Dict[str, float]] = None,
+	messages: Sequence[str] = MESSAGES,
+	seed: int = 0,
+	batch_size: int = 10000,
+	workers: int = 1,
+) -> int:
+	"""Insert `count` generated logs between start and end, split into `workers` time shards loaded in parallel."""
+	with engine.begin() as conn:
+		install_partitions(conn, now=start, until=end)
+	if engine.dialect.name == "sqlite":
+		# SQLite allows one writer at a time; extra processes would only wait on the lock
+		workers = 1
+	workers = max(1, min(workers, count))
+	span = end - start
+	shards = []
+	for i in range(workers):
+		lo, hi = count * i // workers, count * (i + 1) // workers
+		shards.append({
+			"count": hi - lo,
+			"start": start + span * i / workers,
+			"end": start + span * (i + 1) / workers,
+			"severity_weights": severity_weights or DEFAULT_SEVERITY_WEIGHTS,
+			"source_weights": source_weights or DEFAULT_SOURCE_WEIGHTS,
+			"messages": list(messages),
+			"seed": seed + i,
+			"batch_size": batch_size,
+		})
+	if workers == 1:
+		loaded = _seed_shard(shards[0])
+	else:
+		# Intern the values every shard shares up front, so the shards find them instead of racing to insert them
+		_preintern(shards[0])
+		with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+			loaded = sum(pool.map(_seed_shard, shards))
+	# Bulk loading bypasses rollup maintenance
+	db: Session = SessionLocal()
+	try:
+		LogRollupRepository(db).rebuild()
+	finally:
+		db.close()
+	return loaded
+
+
+def seed_data(admin_password: str, log_count: int, bulk: Optional[Dict[str, Any]] = None):
 	Base.metadata.create_all(bind=engine)
 	db: Session = SessionLocal()
 	try:
@@ -38,6 +182,10 @@ def seed_data(admin_password: str, log_count: int):
 			db.add(admin)
 			db.commit()
 
+		if bulk is not None:
+			bulk_seed(log_count, **bulk)
+			return
+
 		log_repo = LogRepository(db)
 		# Generate random logs
 		for i in range(log_count):
@@ -52,10 +200,30 @@ def main():
 	parser = argparse.ArgumentParser(description="Seed database with admin user and logs")
 	parser.add_argument("--admin-password", default="Admin@12345", help="Password for the admin user")
 	parser.add_argument("--logs", type=int, default=50, help="Number of random logs to generate")
+	bulk = parser.add_argument_group("bulk mode", "Generate large datasets in batches, spread over time")
+	bulk.add_argument("--bulk", action="store_true", help="Insert in large batches (COPY on Postgres) with spread-out timestamps")
+	bulk.add_argument("--days", type=float, default=30, help="Time span the timestamps cover, ending at --end")
+	bulk.add_argument("--end", type=datetime.fromisoformat, default=None, help="Latest timestamp (ISO 8601, default now)")
+	bulk.add_argument("--severity-weights", type=parse_weights, default=None, help="e.g. DEBUG=20,INFO=65,WARNING=10,ERROR=5")
+	bulk.add_argument("--source-weights", type=parse_weights, default=None, help="e.g. api=10,db=3,auth=1")
+	bulk.add_argument("--batch-size", type=int, default=10000, help="Rows generated and inserted per batch")
+	bulk.add_argument("--workers", type=int, default=1, help="Processes loading disjoint time shards in parallel (Postgres)")
+	bulk.add_argument("--seed", type=int, default=0, help="Random seed; the same arguments produce the same rows")
 	args = parser.parse_args()
-	seed_data(args.admin_password, args.logs)
+	options = None
+	if args.bulk:
+		end = args.end or datetime.now(timezone.utc)
+		end = end if end.tzinfo else end.replace(tzinfo=timezone.utc)
+		options = {
+			"start": end - timedelta(days=args.days),
+			"end": end,
+			"severity_weights": args.severity_weights,
+			"source_weights": args.source_weights,
+			"seed": args.seed,
+			"batch_size": args.batch_size,
+			"workers": args.workers,
+		}
+	seed_data(args.admin_password, args.logs, options)
 
 if __name__ == "__main__":
 	main()
-
-
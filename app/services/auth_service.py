@@ -1,28 +1,30 @@
 from app.core import security
 from typing import Optional
+from starlette.concurrency import run_in_threadpool
 from app.repositories.user_repository import UserRepository
+from app.services.password_hasher import PasswordHasher, password_hasher
 
 class AuthService:
-    def __init__(self, user_repo: UserRepository):
+    def __init__(self, user_repo: UserRepository, hasher: PasswordHasher = password_hasher):
         self.user_repo = user_repo
+        self.hasher = hasher
 
-    def register(self, username: str, password: str, name: Optional[str] = None, email: Optional[str] = None):
-        existing = self.user_repo.get_by_username(username)
+    # Async so that waiting on the hasher holds no threadpool thread; the short queries still run in the threadpool
+    async def register(self, username: str, password: str, name: Optional[str] = None, email: Optional[str] = None):
+        existing = await run_in_threadpool(self.user_repo.get_by_username, username)
         if existing:
             # In a real app, raise an HTTPException in the route layer
             raise ValueError("Username already exists")
-        hashed = security.hash_password(password)
-        return self.user_repo.create(username, hashed, name=name, email=email)
+        hashed = await self.hasher.hash(password)
+        return await run_in_threadpool(self.user_repo.create, username, hashed, name=name, email=email)
 
-    def authenticate(self, username: str, password: str):
-        user = self.user_repo.get_by_username(username)
+    async def authenticate(self, username: str, password: str):
+        user = await run_in_threadpool(self.user_repo.get_by_username, username)
         if not user:
             raise ValueError("Invalid credentials")
-        if not security.verify_password(password, user.password):
+        if not await self.hasher.verify(password, user.password):
             raise ValueError("Invalid credentials")
         return user
 
     def create_token(self, username: str) -> str:
         return security.create_access_token(username)
-
-
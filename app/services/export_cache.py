@@ -0,0 +1,109 @@
+import hashlib
+import json
+import os
+import uuid
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+from rq import Queue
+from rq.job import Job
+from app.core.config import settings
+from app.jobs.export_jobs import FAILED_PART_STATUSES
+
+_PREFIX = "exports:by-filter"
+_IN_FLIGHT = ("queued", "started", "deferred", "scheduled")
+
+
+def _utc(ts: Optional[datetime]) -> Optional[str]:
+    if ts is None:
+        return None
+    return (ts.astimezone(timezone.utc) if ts.tzinfo else ts.replace(tzinfo=timezone.utc)).isoformat()
+
+
+def export_key(
+    start: Optional[datetime],
+    end: Optional[datetime],
+    severity: Optional[str],
+    source: Optional[str],
+    compress: bool,
+    export_format: str,
+    q: Optional[str] = None,
+) -> str:
+    """Hash of everything that determines an export's content; requests with equal keys produce equal files."""
+    normalized = {
+        "start": _utc(start),
+        "end": _utc(end),
+        "severity": severity,
+        "source": source,
+        "format": export_format,
+        # Only CSV has a compressed variant
+        "compress": bool(compress) and export_format == "csv",
+        "q": " ".join(q.split()) if q else None,
+    }
+    return hashlib.sha256(json.dumps(normalized, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class ExportCache:
+    """Maps a filter hash to the export job that produces it, so identical requests share one job and one file.
+
+    A lookup either finds a reusable job (finished within EXPORT_CACHE_TTL seconds with its file still
+    on disk, or still in flight) or claims the hash for a new job id with SET NX. Concurrent identical
+    requests therefore enqueue a single job. Mappings expire with the files, after EXPORT_MAX_AGE.
+    """
+
+    def __init__(self, queue: Queue):
+        self.queue = queue
+        self.redis = queue.connection
+
+    def _usable(self, job: Optional[Job]) -> Optional[str]:
+        if job is None:
+            return None
+        status = job.get_status(refresh=False)
+        if status in _IN_FLIGHT:
+            # A partitioned export waits on its parts; once one of them fails it stays deferred forever
+            part_ids = job.meta.get("parts")
+            if part_ids:
+                parts = Job.fetch_many(part_ids, connection=self.redis)
+                if any((part.get_status() if part else "missing") in FAILED_PART_STATUSES for part in parts):
+                    return None
+            return "in_flight"
+        if status == "finished" and job.ended_at is not None:
+            ended = job.ended_at if job.ended_at.tzinfo else job.ended_at.replace(tzinfo=timezone.utc)
+            fresh = (datetime.now(timezone.utc) - ended).total_seconds() <= settings.EXPORT_CACHE_TTL
+            path = job.return_value()
+            if fresh and isinstance(path, str) and os.path.exists(path):
+                return "finished"
+        return None
+
+    def acquire(self, key: str, reuse: bool = True) -> Tuple[Optional[Job], Optional[str], str]:
+        """Return (job, how, None) for a reusable job, or (None, None, job_id) with the hash claimed for job_id."""
+        name = f"{_PREFIX}:{key}"
+        job_id = str(uuid.uuid4())
+        if not reuse:
+            self.redis.set(name, job_id, ex=settings.EXPORT_MAX_AGE)
+            return None, None, job_id
+        for _ in range(3):
+            if self.redis.set(name, job_id, nx=True, ex=settings.EXPORT_MAX_AGE):
+                return None, None, job_id
+            current = self.redis.get(name)
+            if current is None:
+                continue
+            job = self.queue.fetch_job(current.decode())
+            how = self._usable(job)
+            if how is not None:
+                return job, how, None
+            # Failed, expired or evicted: drop the mapping unless someone replaced it meanwhile
+            with self.redis.pipeline() as pipe:
+                pipe.watch(name)
+                if pipe.get(name) == current:
+                    pipe.multi()
+                    pipe.delete(name)
+                    pipe.execute()
+        # Lost every race to other requests; run our own job rather than fail the request
+        self.redis.set(name, job_id, ex=settings.EXPORT_MAX_AGE)
+        return None, None, job_id
+
+    def release(self, key: str, job_id: str) -> None:
+        # Undo a claim whose job could not be enqueued
+        name = f"{_PREFIX}:{key}"
+        if self.redis.get(name) == job_id.encode():
+            self.redis.delete(name)
@@ -0,0 +1,128 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.repositories.log_repository import LogRepository
+from app.services.query_cache import get_query_cache
+
+logger = logging.getLogger(__name__)
+
+
+class IngestBuffer:
+    """Bounded in-process buffer drained into the logs table by a background flusher.
+
+    A flush is triggered when `batch_size` records are pending or `flush_interval`
+    seconds have passed since the last one, whichever comes first.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], max_size: int, batch_size: int, flush_interval: float):
+        self.session_factory = session_factory
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._items: deque = deque()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self.buffered = 0
+        self.flushed = 0
+        self.dropped = 0
+
+    def put(self, record: Dict[str, Any]) -> bool:
+        # Returns False when the buffer is full so the caller can apply backpressure
+        with self._cond:
+            if len(self._items) >= self.max_size:
+                self.dropped += 1
+                return False
+            self._items.append(record)
+            self.buffered += 1
+            if len(self._items) >= self.batch_size:
+                self._cond.notify()
+        return True
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="ingest-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def flush(self) -> None:
+        while True:
+            batch = self._take()
+            if not batch:
+                return
+            self._write(batch)
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {
+                "pending": len(self._items),
+                "capacity": self.max_size,
+                "buffered": self.buffered,
+                "flushed": self.flushed,
+                "dropped": self.dropped,
+            }
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                deadline = time.monotonic() + self.flush_interval
+                while not self._stopping and len(self._items) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._stopping:
+                    return
+            batch = self._take()
+            if batch:
+                self._write(batch)
+
+    def _take(self) -> List[Dict[str, Any]]:
+        with self._cond:
+            count = min(len(self._items), self.batch_size)
+            return [self._items.popleft() for _ in range(count)]
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        db = self.session_factory()
+        try:
+            LogRepository(db).bulk_create(batch)
+        except Exception:
+            db.rollback()
+            logger.exception("Dropping %d buffered logs after failed flush", len(batch))
+            with self._cond:
+                self.dropped += len(batch)
+            return
+        finally:
+            db.close()
+        cache = get_query_cache()
+        if cache is not None:
+            cache.invalidate()
+        with self._cond:
+            self.flushed += len(batch)
+
+
+ingest_buffer = IngestBuffer(
+    SessionLocal,
+    max_size=settings.INGEST_BUFFER_SIZE,
+    batch_size=settings.INGEST_FLUSH_BATCH,
+    flush_interval=settings.INGEST_FLUSH_INTERVAL_MS / 1000,
+)
+
+
+def get_ingest_buffer() -> Optional[IngestBuffer]:
+    return ingest_buffer if settings.INGEST_MODE == "buffered" else None
@@ -1,38 +1,264 @@
-from typing import Optional, List
-from datetime import datetime
-from app.repositories.log_repository import LogRepository
+from typing import Any, Dict, Iterator, Optional, List, Tuple
+from datetime import datetime, timezone
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+from app.repositories.log_repository import AsyncLogRepository, LogRepository
 from app.models.log import Log
+from app.schemas.log import LogCreate
+from app.core.pagination import encode_cursor, decode_cursor
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.services.query_cache import MISS, QueryCache, get_query_cache
+
+HISTOGRAM_INTERVALS = {"1m": 60, "5m": 300, "1h": 3600, "1d": 86400}
+
+# Short-lived exact counts per filter signature, shared by requests in this process
+_count_cache = TTLCache(maxsize=settings.LOG_COUNT_CACHE_SIZE, ttl=settings.LOG_COUNT_CACHE_TTL)
+
+
+def _epoch(ts: datetime) -> int:
+    # Naive timestamps are stored and compared as UTC
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return int(ts.timestamp())
+
+
+def log_json(row) -> Dict[str, Any]:
+    # Same keys and order as LogResponse; dicts (from the query cache) are already in this shape
+    if isinstance(row, dict):
+        return row
+    return {"id": row.id, "timestamp": row.timestamp, "severity": row.severity, "source": row.source, "message": row.message}
+
+
+def _signature_time(ts: Optional[datetime]) -> Optional[str]:
+    # Equal instants written with different offsets share a cache entry
+    if ts is None:
+        return None
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.astimezone(timezone.utc).isoformat()
+
+
+def _list_signature(start: Optional[datetime], end: Optional[datetime], severity: Optional[str], source: Optional[str], limit: int, offset: int, cursor: Optional[str], total_mode: str, q: Optional[str]) -> Dict[str, Any]:
+    return {
+        "start": _signature_time(start),
+        "end": _signature_time(end),
+        "severity": severity,
+        "source": source,
+        "limit": limit,
+        "offset": offset,
+        "cursor": cursor,
+        "total_mode": total_mode,
+        "q": q,
+    }
+
+
+def _aggregate_signature(start: Optional[datetime], end: Optional[datetime], severity: Optional[str], source: Optional[str], by: str) -> Dict[str, Any]:
+    return {"start": _signature_time(start), "end": _signature_time(end), "severity": severity, "source": source, "by": by}
+
+
+def _cacheable_list(result: Dict[str, Any]) -> Dict[str, Any]:
+    result["items"] = [log_json(l) for l in result["items"]]
+    return result
 
 
 class LogService:
-    def __init__(self, repo: LogRepository):
+    def __init__(self, repo: LogRepository, cache: Optional[QueryCache] = None, use_cache: bool = True):
         self.repo = repo
+        self.cache = (cache if cache is not None else get_query_cache()) if use_cache else None
+
+    def _invalidate(self) -> None:
+        # Called after the write commits, so a reader can never re-cache the pre-write result under the new generation
+        if self.cache is not None:
+            self.cache.invalidate()
 
     def create(self, severity: str, source: str, message: str) -> Log:
-        return self.repo.create(severity, source, message)
+        log = self.repo.create(severity, source, message)
+        self._invalidate()
+        return log
+
+    def create_batch(self, items: List[Dict[str, Any]]):
+        rows = []
+        positions = []
+        errors = []
+        for index, item in enumerate(items):
+            try:
+                body = LogCreate.model_validate(item)
+            except ValidationError as e:
+                errors.append({"index": index, "errors": e.errors(include_url=False, include_context=False)})
+                continue
+            rows.append(body.model_dump())
+            positions.append(index)
+        ids: List[Optional[int]] = [None] * len(items)
+        if rows:
+            for index, log_id in zip(positions, self.repo.bulk_create(rows)):
+                ids[index] = log_id
+            self._invalidate()
+        return {"accepted": len(rows), "rejected": len(errors), "ids": ids, "errors": errors}
 
     def get(self, log_id: int) -> Optional[Log]:
         return self.repo.get(log_id)
 
-    def list(self, start: Optional[datetime], end: Optional[datetime], severity: Optional[str], source: Optional[str], limit: int, offset: int):
-        items = self.repo.list(start, end, severity, source, limit, offset)
-        total = self.repo.count(start, end, severity, source)
-        return {"items": items, "total": total}
+    def list(self, start: Optional[datetime], end: Optional[datetime], severity: Optional[str], source: Optional[str], limit: int, offset: int, cursor: Optional[str] = None, total_mode: str = "exact", q: Optional[str] = None):
+        if self.cache is None:
+            return self._list(start, end, severity, source, limit, offset, cursor, total_mode, q)
+        signature = _list_signature(start, end, severity, source, limit, offset, cursor, total_mode, q)
+
+        def compute():
+            return _cacheable_list(self._list(start, end, severity, source, limit, offset, cursor, total_mode, q))
+
+        return self.cache.get_or_compute("list", signature, compute)
+
+    def _list(self, start: Optional[datetime], end: Optional[datetime], severity: Optional[str], source: Optional[str], limit: int, offset: int, cursor: Optional[str] = None, total_mode: str = "exact", q: Optional[str] = None):
+        after = decode_cursor(cursor) if cursor else None
+        items = self.repo.list(start, end, severity, source, limit, offset, after, q)
+        total, total_exact = self._total(total_mode, start, end, severity, source, q)
+        next_cursor = encode_cursor(items[-1].timestamp, items[-1].id) if len(items) == limit else None
+        return {"items": items, "total": total, "total_mode": total_mode, "total_exact": total_exact, "next_cursor": next_cursor}
+
+    def stream(self, start: Optional[datetime], end: Optional[datetime], severity: Optional[str], source: Optional[str], batch_size: int, q: Optional[str] = None) -> Iterator[list]:
+        return self.repo.stream(start, end, severity, source, batch_size, q=q)
+
+    def time_bounds(self, start: Optional[datetime], end: Optional[datetime], severity: Optional[str], source: Optional[str], q: Optional[str] = None) -> Tuple[Optional[datetime], Optional[datetime]]:
+        return self.repo.time_bounds(start, end, severity, source, q)
+
+    def _total(self, mode: str, start: Optional[datetime], end: Optional[datetime], severity: Optional[str], source: Optional[str], q: Optional[str] = None) -> Tuple[Optional[int], bool]:
+        # Returns (total, whether it is an exact, fresh count)
+        if mode == "none":
+            return None, False
+        if mode == "estimate":
+            cap = settings.LOG_COUNT_ESTIMATE_CAP
+            capped = self.repo.count_capped(start, end, severity, source, cap, q)
+            if capped <= cap:
+                return capped, True
+            estimate = self.repo.estimate_count(start, end, severity, source, q)
+            return max(estimate or 0, cap), False
+        if mode == "cached":
+            key = (
+                _signature_time(start),
+                _signature_time(end),
+                severity,
+                source,
+                q,
+            )
+            cached = _count_cache.get(key)
+            if cached is not None:
+                return cached, False
+            total = self.repo.count(start, end, severity, source, q)
+            _count_cache.set(key, total)
+            return total, True
+        return self.repo.count(start, end, severity, source, q), True
 
     def update(self, log_id: int, severity: Optional[str], source: Optional[str], message: Optional[str]) -> Optional[Log]:
         log = self.repo.get(log_id)
         if not log:
             return None
-        return self.repo.update(log, severity, source, message)
+        updated = self.repo.update(log, severity, source, message)
+        self._invalidate()
+        return updated
 
     def delete(self, log_id: int) -> bool:
         log = self.repo.get(log_id)
         if not log:
             return False
         self.repo.delete(log)
+        self._invalidate()
         return True
 
     def aggregate(self, start: Optional[datetime], end: Optional[datetime], severity: Optional[str], source: Optional[str], by: str):
-        return self.repo.aggregate(start, end, severity, source, by)
+        if self.cache is None:
+            return self.repo.aggregate(start, end, severity, source, by)
+        signature = _aggregate_signature(start, end, severity, source, by)
+        return self.cache.get_or_compute("aggregate", signature, lambda: self.repo.aggregate(start, end, severity, source, by))
+
+    def histogram(self, start: Optional[datetime], end: Optional[datetime], severity: Optional[str], source: Optional[str], interval: str, split: Optional[str]):
+        seconds = HISTOGRAM_INTERVALS[interval]
+        result = {"interval": interval, "split": split, "buckets": []}
+        lo, hi = start, end
+        if lo is None or hi is None:
+            # Open-ended ranges are bounded by the matching data
+            data_lo, data_hi = self.repo.time_bounds(start, end, severity, source)
+            if data_lo is None:
+                return result
+            lo = lo or data_lo
+            hi = hi or data_hi
+        first = _epoch(lo) // seconds * seconds
+        last = _epoch(hi) // seconds * seconds
+        if (last - first) // seconds + 1 > settings.HISTOGRAM_MAX_BUCKETS:
+            raise ValueError(f"Range spans more than {settings.HISTOGRAM_MAX_BUCKETS} buckets; use a larger interval or a shorter range")
+
+        counts = self.repo.histogram(start, end, severity, source, seconds, split)
+        series = sorted({key[1] for key, n in counts.items() if n}) if split else []
+        for bucket in range(first, last + 1, seconds):
+            entry = {"start": datetime.fromtimestamp(bucket, tz=timezone.utc)}
+            if split:
+                entry["counts"] = {key: counts.get((bucket, key), 0) for key in series}
+                entry["count"] = sum(entry["counts"].values())
+            else:
+                entry["count"] = counts.get((bucket,), 0)
+            result["buckets"].append(entry)
+        return result
+
+
+
+
+class AsyncLogService:
+    """Async counterpart of LogService for the async routes; each call runs the LogService logic through AsyncLogRepository.
+
+    The query cache talks to Redis with blocking calls, so it is used from a worker thread here rather than
+    inside run_sync, which executes on the event loop.
+    """
+
+    def __init__(self, repo: AsyncLogRepository, cache: Optional[QueryCache] = None):
+        self.repo = repo
+        self.cache = cache if cache is not None else get_query_cache()
+
+    async def _call(self, method: str, *args):
+        return await self.repo.run_sync(lambda repo: getattr(LogService(repo, use_cache=False), method)(*args))
+
+    async def _cached(self, namespace: str, signature: Dict[str, Any], compute):
+        key, cached = await run_in_threadpool(self.cache.lookup, namespace, signature)
+        if cached is not MISS:
+            return cached
+        value = await compute()
+        if key is not None:
+            await run_in_threadpool(self.cache.store, key, value)
+        return value
+
+    async def _invalidate(self) -> None:
+        if self.cache is not None:
+            await run_in_threadpool(self.cache.invalidate)
+
+    async def create(self, severity: str, source: str, message: str) -> Log:
+        log = await self._call("create", severity, source, message)
+        await self._invalidate()
+        return log
+
+    async def create_batch(self, items: List[Dict[str, Any]]):
+        result = await self._call("create_batch", items)
+        if result["accepted"]:
+            await self._invalidate()
+        return result
+
+    async def get(self, log_id: int) -> Optional[Log]:
+        return await self._call("get", log_id)
+
+    async def list(self, start: Optional[datetime], end: Optional[datetime], severity: Optional[str], source: Optional[str], limit: int, offset: int, cursor: Optional[str] = None, total_mode: str = "exact", q: Optional[str] = None):
+        args = (start, end, severity, source, limit, offset, cursor, total_mode, q)
+        if self.cache is None:
+            return await self._call("list", *args)
+
+        async def compute():
+            return _cacheable_list(await self._call("list", *args))
+
+        return await self._cached("list", _list_signature(*args), compute)
 
+    async def aggregate(self, start: Optional[datetime], end: Optional[datetime], severity: Optional[str], source: Optional[str], by: str):
+        if self.cache is None:
+            return await self._call("aggregate", start, end, severity, source, by)
+        return await self._cached(
+            "aggregate", _aggregate_signature(start, end, severity, source, by), lambda: self._call("aggregate", start, end, severity, source, by)
+        )
 
+    async def histogram(self, start: Optional[datetime], end: Optional[datetime], severity: Optional[str], source: Optional[str], interval: str, split: Optional[str]):
+        return await self._call("histogram", start, end, severity, source, interval, split)
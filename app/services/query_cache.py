@@ -0,0 +1,105 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+from redis import Redis, RedisError
+from app.core.config import settings
+from app.core.redis_conn import get_redis
+from app.core.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+# Returned by QueryCache.lookup when there is no entry
+MISS = object()
+
+
+class QueryCache:
+    """Read-result cache in Redis, shared by every API process.
+
+    Entries are keyed by namespace, the current write generation and a normalized filter signature.
+    Writes bump the generation, which orphans every entry at once; orphans then age out through the TTL.
+    A sorted-set index evicts the oldest entries beyond `max_entries`. Redis errors fall through to the database.
+    """
+
+    def __init__(self, redis_factory: Callable[[], Redis], prefix: str, ttl: int, max_entries: int):
+        self.redis_factory = redis_factory
+        self.prefix = prefix
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._redis: Optional[Redis] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _client(self) -> Redis:
+        if self._redis is None:
+            self._redis = self.redis_factory()
+        return self._redis
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def get_or_compute(self, namespace: str, signature: Dict[str, Any], compute: Callable[[], Any]) -> Any:
+        # compute() must return a value serialization.dumps can encode; hits return it decoded from JSON
+        key, cached = self.lookup(namespace, signature)
+        if cached is not MISS:
+            return cached
+        value = compute()
+        if key is not None:
+            self.store(key, value)
+        return value
+
+    def lookup(self, namespace: str, signature: Dict[str, Any]) -> Tuple[Optional[str], Any]:
+        """(key, value) for a signature; value is MISS on a miss, and key is None when Redis is unavailable."""
+        digest = hashlib.sha1(json.dumps(signature, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+        try:
+            redis = self._client()
+            generation = int(redis.get(f"{self.prefix}:generation") or 0)
+            key = f"{self.prefix}:{namespace}:{generation}:{digest}"
+            cached = redis.get(key)
+        except RedisError:
+            self._count("errors")
+            return None, MISS
+        if cached is not None:
+            self._count("hits")
+            return key, json.loads(cached)
+        self._count("misses")
+        return key, MISS
+
+    def store(self, key: str, value: Any) -> None:
+        index = f"{self.prefix}:index"
+        try:
+            redis = self._client()
+            pipe = redis.pipeline(transaction=False)
+            pipe.set(key, dumps(value), ex=self.ttl)
+            pipe.zadd(index, {key: time.time()})
+            pipe.zcard(index)
+            size = pipe.execute()[-1]
+            if size > self.max_entries:
+                evicted = [k for k, _ in redis.zpopmin(index, size - self.max_entries)]
+                if evicted:
+                    redis.delete(*evicted)
+        except RedisError:
+            self._count("errors")
+
+    def invalidate(self) -> None:
+        try:
+            self._client().incr(f"{self.prefix}:generation")
+        except RedisError:
+            self._count("errors")
+            logger.warning("Could not bump the query cache generation; cached reads may be stale for up to %ss", self.ttl)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "errors": self.errors, "ttl": self.ttl, "max_entries": self.max_entries}
+
+
+query_cache = QueryCache(get_redis, prefix="logs:query-cache", ttl=settings.QUERY_CACHE_TTL, max_entries=settings.QUERY_CACHE_MAX_ENTRIES)
+
+
+def get_query_cache() -> Optional[QueryCache]:
+    return query_cache if settings.QUERY_CACHE_ENABLED else None
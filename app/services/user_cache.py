@@ -0,0 +1,64 @@
+import logging
+from typing import Callable, Optional
+from redis import Redis, RedisError
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.redis_conn import get_redis
+from app.schemas.user import ProfileResponse
+
+logger = logging.getLogger(__name__)
+
+
+class UserCache:
+    """Users resolved by get_current_user, keyed by username.
+
+    The "memory" backend is a per-process LRU; UserService invalidates it locally, and other workers
+    pick up changes once their entry expires after `ttl` seconds. The "redis" backend is shared by
+    all workers, so invalidation is immediate everywhere. A ttl of 0 disables caching.
+    """
+
+    def __init__(self, backend: str, ttl: int, maxsize: int, redis_factory: Callable[[], Redis], prefix: str = "users:auth"):
+        self.backend = backend
+        self.ttl = ttl
+        self.prefix = prefix
+        self.redis_factory = redis_factory
+        self._redis: Optional[Redis] = None
+        self._local = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def _client(self) -> Redis:
+        if self._redis is None:
+            self._redis = self.redis_factory()
+        return self._redis
+
+    def get(self, username: str) -> Optional[ProfileResponse]:
+        if self.ttl <= 0:
+            return None
+        if self.backend != "redis":
+            return self._local.get(username)
+        try:
+            cached = self._client().get(f"{self.prefix}:{username}")
+        except RedisError:
+            return None
+        return ProfileResponse.model_validate_json(cached) if cached is not None else None
+
+    def set(self, username: str, user: ProfileResponse) -> None:
+        if self.ttl <= 0:
+            return
+        if self.backend != "redis":
+            self._local.set(username, user)
+            return
+        try:
+            self._client().set(f"{self.prefix}:{username}", user.model_dump_json(), ex=self.ttl)
+        except RedisError:
+            pass
+
+    def invalidate(self, username: str) -> None:
+        self._local.delete(username)
+        if self.backend == "redis":
+            try:
+                self._client().delete(f"{self.prefix}:{username}")
+            except RedisError:
+                logger.warning("Could not invalidate cached user %s; it expires within %ss", username, self.ttl)
+
+
+user_cache = UserCache(settings.USER_CACHE_BACKEND, settings.USER_CACHE_TTL, settings.USER_CACHE_SIZE, get_redis)
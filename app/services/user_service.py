@@ -2,6 +2,7 @@ from typing import Optional, List
 from pydantic import EmailStr
 from app.repositories.user_repository import UserRepository
 from app.models.user import User
+from app.services.user_cache import user_cache
 
 
 class UserService:
@@ -21,11 +22,15 @@ class UserService:
         user = self.repo.get(user_id)
         if not user:
             return None
-        return self.repo.update(user, name, email, is_active, is_admin)
+        updated = self.repo.update(user, name, email, is_active, is_admin)
+        user_cache.invalidate(updated.username)
+        return updated
 
     def delete(self, user_id: int) -> bool:
         user = self.repo.get(user_id)
         if not user:
             return False
+        username = user.username
         self.repo.delete(user)
+        user_cache.invalidate(username)
         return True
\ No newline at end of file
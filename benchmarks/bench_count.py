@@ -0,0 +1,20 @@
+from datetime import timedelta
+from app.repositories.log_repository import LogRepository
+from benchmarks.common import measure, result
+
+
+def run(ctx):
+    db = ctx.session_factory()
+    try:
+        repo = LogRepository(db)
+        day_start = ctx.end - timedelta(days=1)
+        cases = [
+            ("all", lambda: repo.count(None, None, None, None), {}),
+            ("severity", lambda: repo.count(None, None, "INFO", None), {"severity": "INFO"}),
+            ("last_day", lambda: repo.count(day_start, ctx.end, None, None), {"window": "1d"}),
+            ("last_day_severity_source", lambda: repo.count(day_start, ctx.end, "ERROR", "api"), {"window": "1d", "severity": "ERROR", "source": "api"}),
+            ("capped_10000", lambda: repo.count_capped(None, None, None, None, 10000), {"cap": 10000}),
+        ]
+        return [result("count", name, params, **measure(fn, ctx.repeat)) for name, fn, params in cases]
+    finally:
+        db.close()
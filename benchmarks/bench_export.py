@@ -0,0 +1,34 @@
+import importlib.util
+import os
+from app.jobs.export_jobs import export_logs_csv_job
+from benchmarks.common import result, run_isolated
+
+
+def _export(export_format: str, compress: bool) -> int:
+    # Runs in a spawned child (which imports this module, and the app, before the clock starts);
+    # the job runs inline, outside RQ, on the whole dataset
+    path = export_logs_csv_job(None, None, None, None, compress=compress, export_format=export_format)
+    size = os.path.getsize(path)
+    os.remove(path)
+    return size
+
+
+def run(ctx):
+    cases = [("csv", False), ("csv", True)]
+    if importlib.util.find_spec("pyarrow") is not None:
+        cases.append(("parquet", False))
+    results = []
+    for export_format, compress in cases:
+        outcome = run_isolated(_export, export_format, compress)
+        name = export_format + ("_gzip" if compress else "")
+        results.append(result(
+            "export",
+            name,
+            {"format": export_format, "compress": compress},
+            wall_s=round(outcome["wall_s"], 3),
+            rows_per_s=round(ctx.rows / outcome["wall_s"]) if outcome["wall_s"] else None,
+            bytes=outcome["value"],
+            baseline_rss_mb=outcome["baseline_rss_mb"],
+            peak_rss_mb=outcome["peak_rss_mb"],
+        ))
+    return results
@@ -0,0 +1,49 @@
+import time
+from sqlalchemy import delete
+from app.models.log import Log
+from app.models.log_rollup import LogRollup
+from app.repositories.log_repository import LogRepository
+from app.services.log_service import LogService
+from benchmarks.common import result, summarize
+from benchmarks.dataset import generate_rows
+
+
+def run(ctx):
+    # Runs last: it adds rows, and the read suites should see exactly the generated dataset
+    db = ctx.session_factory()
+    try:
+        svc = LogService(LogRepository(db))
+        single, batch_size, batch_rows = ctx.args.ingest_single, ctx.args.ingest_batch_size, ctx.args.ingest_batch_rows
+        # A different seed than the dataset, so ingest also interns some new messages
+        rows = [row for batch in generate_rows(single + batch_rows, 1, ctx.args.seed + 1, 10000) for row in batch]
+        for row in rows:
+            del row["timestamp"]
+
+        results = []
+        samples = []
+        for row in rows[:single]:
+            started = time.perf_counter()
+            svc.create(row["severity"], row["source"], row["message"])
+            samples.append(time.perf_counter() - started)
+        if samples:
+            results.append(result("ingest", "single", {"rows": single}, rows_per_s=round(single / sum(samples)), **summarize(samples)))
+
+        samples = []
+        batched = rows[single:]
+        for i in range(0, len(batched), batch_size):
+            started = time.perf_counter()
+            outcome = svc.create_batch(batched[i:i + batch_size])
+            samples.append(time.perf_counter() - started)
+            assert outcome["rejected"] == 0
+        if samples:
+            results.append(result(
+                "ingest", "batch", {"rows": len(batched), "batch_size": batch_size}, rows_per_s=round(len(batched) / sum(samples)), **summarize(samples)
+            ))
+        return results
+    finally:
+        # Ingested rows carry the current time, after the dataset's range; removing them keeps the dataset reusable
+        db.rollback()
+        db.execute(delete(Log).where(Log.timestamp > ctx.end))
+        db.execute(delete(LogRollup).where(LogRollup.bucket_start > ctx.end))
+        db.commit()
+        db.close()
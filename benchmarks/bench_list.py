@@ -0,0 +1,34 @@
+from sqlalchemy import select
+from app.core.pagination import encode_cursor
+from app.models.log import Log
+from app.repositories.log_repository import LogRepository
+from app.services.log_service import LogService
+from benchmarks.common import measure, result
+
+PAGE = 100
+
+
+def run(ctx):
+    db = ctx.session_factory()
+    try:
+        svc = LogService(LogRepository(db))
+        deep = max(ctx.rows // 2 - PAGE, 0)
+        # The row at the deep offset, so offset and cursor paging fetch the same page
+        ts, log_id = db.execute(select(Log.timestamp, Log.id).order_by(Log.timestamp.desc(), Log.id.desc()).offset(deep).limit(1)).one()
+        cursor = encode_cursor(ts, log_id)
+
+        def page(**kwargs):
+            params = {"start": None, "end": None, "severity": None, "source": None, "limit": PAGE, "offset": 0, "total_mode": "none", **kwargs}
+            return lambda: svc.list(**params)
+
+        cases = [
+            ("shallow_offset", {"offset": 0}),
+            ("deep_offset", {"offset": deep}),
+            ("deep_cursor", {"cursor": cursor}),
+            ("shallow_filtered", {"severity": "ERROR", "source": "billing"}),
+            ("shallow_exact_total", {"total_mode": "exact"}),
+            ("shallow_search", {"q": "timeout"}),
+        ]
+        return [result("list", name, {"limit": PAGE, **params}, **measure(page(**params), ctx.repeat)) for name, params in cases]
+    finally:
+        db.close()
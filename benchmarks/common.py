@@ -0,0 +1,77 @@
+import multiprocessing
+import resource
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+def peak_rss_mb(who: int = resource.RUSAGE_SELF) -> float:
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    rss = resource.getrusage(who).ru_maxrss
+    return round(rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024, 1)
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    return {
+        "runs": len(ordered),
+        "min_ms": round(ordered[0] * 1000, 3),
+        "median_ms": round(statistics.median(ordered) * 1000, 3),
+        "p95_ms": round(p95 * 1000, 3),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+    }
+
+
+def measure(fn: Callable[[], Any], repeat: int, warmup: int = 1) -> Dict[str, float]:
+    """Call fn warmup + repeat times and summarize the timed calls."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+def result(suite: str, name: str, params: Optional[Dict[str, Any]] = None, **metrics) -> Dict[str, Any]:
+    return {"suite": suite, "name": name, "params": params or {}, **metrics}
+
+
+def _child(conn, fn, args):
+    try:
+        baseline = peak_rss_mb()
+        started = time.perf_counter()
+        value = fn(*args)
+        conn.send({"value": value, "wall_s": time.perf_counter() - started, "baseline_rss_mb": baseline, "peak_rss_mb": peak_rss_mb()})
+    except BaseException as e:
+        conn.send({"error": repr(e)})
+    finally:
+        conn.close()
+
+
+def run_isolated(fn: Callable[..., Any], *args) -> Dict[str, Any]:
+    """Run fn in a fresh spawned process so its peak RSS is not hidden by the parent's."""
+    parent, child = multiprocessing.get_context("spawn").Pipe(duplex=False)
+    process = multiprocessing.get_context("spawn").Process(target=_child, args=(child, fn, args))
+    process.start()
+    child.close()
+    outcome = parent.recv()
+    process.join()
+    if "error" in outcome:
+        raise RuntimeError(f"{fn.__name__} failed in child process: {outcome['error']}")
+    return outcome
+
+
+class BenchContext:
+    """What every suite needs: a session factory, the dataset's shape and how often to repeat reads."""
+
+    def __init__(self, session_factory, rows: int, start, end, repeat: int, args):
+        self.session_factory = session_factory
+        self.rows = rows
+        self.start = start
+        self.end = end
+        self.repeat = repeat
+        self.args = args
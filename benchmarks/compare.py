@@ -0,0 +1,46 @@
+"""Compare two benchmark result files: python -m benchmarks.compare baseline.json candidate.json"""
+import argparse
+import json
+
+# Lower is better for timings, higher for throughput
+_METRICS = [("median_ms", False), ("wall_s", False), ("rows_per_s", True), ("peak_rss_mb", False)]
+
+
+def _index(path):
+    with open(path) as f:
+        report = json.load(f)
+    return report["meta"], {(r["suite"], r["name"]): r for r in report["results"]}
+
+
+def compare(baseline_path: str, candidate_path: str):
+    base_meta, base = _index(baseline_path)
+    cand_meta, cand = _index(candidate_path)
+    rows = []
+    for key in sorted(base.keys() & cand.keys()):
+        for metric, higher_is_better in _METRICS:
+            old, new = base[key].get(metric), cand[key].get(metric)
+            if old is None or new is None:
+                continue
+            change = (new - old) / old * 100 if old else 0.0
+            better = change > 0 if higher_is_better else change < 0
+            rows.append((f"{key[0]}/{key[1]}", metric, old, new, change, better))
+    return base_meta, cand_meta, rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    args = parser.parse_args(argv)
+    base_meta, cand_meta, rows = compare(args.baseline, args.candidate)
+    for field in ("commit", "database", "rows", "seed"):
+        if base_meta.get(field) != cand_meta.get(field):
+            print(f"note: {field} differs ({base_meta.get(field)} vs {cand_meta.get(field)})")
+    print(f"{'benchmark':<36} {'metric':<12} {'baseline':>12} {'candidate':>12} {'change':>9}")
+    for name, metric, old, new, change, better in rows:
+        marker = "+" if better else ("-" if change else " ")
+        print(f"{name:<36} {metric:<12} {old:>12} {new:>12} {change:>8.1f}% {marker}")
+
+
+if __name__ == "__main__":
+    main()
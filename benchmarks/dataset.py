@@ -0,0 +1,35 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List
+from app import seed as seeding
+
+# Skewed like production traffic: mostly INFO from a handful of busy sources, a long tail of quiet ones
+SEVERITY_WEIGHTS = {"DEBUG": 20, "INFO": 65, "WARNING": 10, "ERROR": 4, "CRITICAL": 1}
+SOURCES = ["api", "auth", "db", "cache", "queue", "storage", "scheduler", "billing", "search", "mailer", "cdn", "third_party"]
+# Zipf-like: the n-th source is 1/n as busy as the first
+SOURCE_WEIGHTS = {source: 1 / (rank + 1) for rank, source in enumerate(SOURCES)}
+
+MESSAGE_TEMPLATES = [
+    "Request processed",
+    "Cache hit",
+    "Cache miss",
+    "Background job finished",
+    "Database connection established",
+    "Database timeout after {n} ms",
+    "Authentication succeeded for user {n}",
+    "Authentication failed for user {n}",
+    "Permission denied on resource {n}",
+    "Slow query took {n} ms",
+    "Retrying upstream call, attempt {n}",
+    "Payload rejected: field {n} invalid",
+]
+
+
+def dataset_range(weeks: float, end: datetime = None):
+    end = end or datetime.now(timezone.utc).replace(microsecond=0)
+    return end - timedelta(weeks=weeks), end
+
+
+def generate_rows(count: int, weeks: float, seed: int, batch_size: int, end: datetime = None) -> Iterator[List[Dict[str, Any]]]:
+    """Batches of benchmark rows spread over `weeks` weeks up to `end`; see app.seed.generate_rows."""
+    start, end = dataset_range(weeks, end)
+    return seeding.generate_rows(count, start, end, SEVERITY_WEIGHTS, SOURCE_WEIGHTS, MESSAGE_TEMPLATES, seed, batch_size)
@@ -1,16 +1,17 @@
 # run_worker.py
+import argparse
 import multiprocessing
 import sys
 import os
 
-if __name__ == "__main__":
-    multiprocessing.set_start_method("spawn")
+# Add project root to sys.path so 'api' package can be imported (also in spawned worker processes)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-    # Add project root to sys.path so 'api' package can be imported
-    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-    from rq import SimpleWorker, Queue
+def work():
+    from rq import Queue
     from app.core.redis_conn import get_redis
+    from app.jobs.worker import MetricsWorker
 
     # Connect to Redis
     redis_conn = get_redis()
@@ -18,6 +19,34 @@ if __name__ == "__main__":
     # Queue(s) to listen to
     queues = [Queue("exports", connection=redis_conn)]
 
-    print("Starting RQ worker for queue: exports ...")
-    worker = SimpleWorker(queues)
-    worker.work()
+    worker = MetricsWorker(queues, connection=redis_conn)
+    # The scheduler runs retries that have an EXPORT_RETRY_INTERVAL
+    worker.work(with_scheduler=True)
+
+
+if __name__ == "__main__":
+    multiprocessing.set_start_method("spawn")
+
+    parser = argparse.ArgumentParser(description="Run RQ workers for the exports queue")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("EXPORT_WORKERS", "1")),
+        help="Number of worker processes; partitioned export parts run concurrently across them",
+    )
+    args = parser.parse_args()
+
+    print(f"Starting {args.workers} RQ worker(s) for queue: exports ...")
+    # A single sweeper for all worker processes keeps EXPORT_DIR within its size and age budget
+    from app.core.config import settings
+    from app.jobs.export_sweeper import ExportSweeper
+
+    ExportSweeper(os.getenv("EXPORT_DIR", "/tmp"), settings.EXPORT_SWEEP_INTERVAL).start()
+    if args.workers <= 1:
+        work()
+    else:
+        processes = [multiprocessing.Process(target=work, name=f"exports-worker-{i}") for i in range(args.workers)]
+        for p in processes:
+            p.start()
+        for p in processes:
+            p.join()
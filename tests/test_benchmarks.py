@@ -0,0 +1,40 @@
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+from benchmarks.dataset import generate_rows
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_dataset_is_reproducible_and_time_ordered():
+    end = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    first = [row for batch in generate_rows(500, 2, seed=7, batch_size=200, end=end) for row in batch]
+    second = [row for batch in generate_rows(500, 2, seed=7, batch_size=200, end=end) for row in batch]
+    assert len(first) == 500
+    assert first == second
+    assert [r["timestamp"] for r in first] == sorted(r["timestamp"] for r in first)
+    assert first[0]["timestamp"] >= datetime(2024, 2, 16, tzinfo=timezone.utc)
+    assert {r["severity"] for r in first} >= {"DEBUG", "INFO", "WARNING"}
+
+
+def test_benchmark_run_writes_results(tmp_path):
+    output = tmp_path / "results.json"
+    args = [
+        sys.executable, "-m", "benchmarks.run",
+        "--database-url", f"sqlite:///{tmp_path / 'bench.db'}",
+        "--rows", "300", "--repeat", "1", "--suites", "list,count,aggregate,ingest",
+        "--ingest-single", "5", "--ingest-batch-rows", "20", "--ingest-batch-size", "10",
+        "--output", str(output),
+    ]
+    subprocess.run(args, cwd=ROOT, check=True, capture_output=True)
+    report = json.loads(output.read_text())
+    assert report["meta"]["rows"] == 300
+    names = {(r["suite"], r["name"]) for r in report["results"]}
+    assert {("dataset", "load"), ("list", "deep_cursor"), ("count", "all"), ("aggregate", "by_source"), ("ingest", "batch")} <= names
+
+    # A second run reuses the dataset, which the ingest suite left untouched
+    subprocess.run(args, cwd=ROOT, check=True, capture_output=True)
+    assert ("dataset", "load") not in {(r["suite"], r["name"]) for r in json.loads(output.read_text())["results"]}
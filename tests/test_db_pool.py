@@ -0,0 +1,21 @@
+import pytest
+from sqlalchemy import create_engine, exc
+
+from app.core.pool import InstrumentedQueuePool
+
+
+def test_pool_records_waits_and_timeouts(test_db_url):
+    engine = create_engine(test_db_url, poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.05)
+    held = engine.connect()
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    stats = engine.pool.describe()
+    assert (stats["size"], stats["in_use"], stats["checkouts"], stats["timeouts"], stats["connects"]) == (1, 1, 1, 1, 1)
+    held.close()
+    engine.dispose()
+
+
+def test_db_pool_stats(client):
+    r = client.get("/api/v1/internal/stats/db-pool")
+    assert r.status_code == 200
+    assert {"size", "in_use", "overflow", "wait_avg_ms", "timeouts"} <= set(r.json()["data"]["sync"])
@@ -1,11 +1,20 @@
+import csv
+import gzip
+import os
+from datetime import datetime, timedelta
 from unittest.mock import patch
 
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.jobs import export_jobs
+
 
 def test_export_enqueue(client):
     with patch("app.api.logs.get_queue") as mock_get_queue:
         mock_q = mock_get_queue.return_value
         mock_job = mock_q.enqueue.return_value
-        mock_job.get_id.return_value = "job-123"
+        mock_job.id = "job-123"
 
         r = client.post("/api/v1/logs/export")
         assert r.status_code == 200
@@ -13,3 +22,284 @@ def test_export_enqueue(client):
         assert data["success"] is True
         assert "job_id" in data["data"]
 
+
+
+def test_export_job_streams_gzip(client, engine, tmp_path, monkeypatch):
+    for i in range(3):
+        client.post("/api/v1/logs/", json={"severity": "WARNING", "source": "export", "message": f"e{i}"})
+
+    monkeypatch.setenv("EXPORT_DIR", str(tmp_path))
+    with patch.object(export_jobs, "SessionLocal", sessionmaker(bind=engine)):
+        path = export_jobs.export_logs_csv_job(None, None, "WARNING", "export", True)
+
+    assert path.endswith(".csv.gz")
+    assert os.listdir(tmp_path) == [os.path.basename(path)]
+    with gzip.open(path, "rt", newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["timestamp", "severity", "source", "message"]
+    assert [r[3] for r in rows[1:]] == ["e2", "e1", "e0"]
+
+
+def test_export_job_parquet(client, engine, tmp_path, monkeypatch):
+    pq = pytest.importorskip("pyarrow.parquet")
+    import pyarrow as pa
+
+    for i in range(3):
+        client.post("/api/v1/logs/", json={"severity": "ERROR", "source": "columnar", "message": f"p{i}"})
+
+    monkeypatch.setenv("EXPORT_DIR", str(tmp_path))
+    with patch.object(export_jobs, "SessionLocal", sessionmaker(bind=engine)):
+        path = export_jobs.export_logs_csv_job(None, None, None, "columnar", False, "parquet")
+
+    assert path.endswith(".parquet")
+    assert export_jobs.export_media_type(path) == "application/vnd.apache.parquet"
+    table = pq.read_table(path)
+    assert table.num_rows == 3
+    assert pa.types.is_dictionary(table.schema.field("severity").type)
+    assert pa.types.is_timestamp(table.schema.field("timestamp").type)
+    assert table.column("message").to_pylist() == ["p2", "p1", "p0"]
+
+
+def test_redis_pool_and_queues_are_shared_per_process():
+    from app.core.redis_conn import get_queue, get_redis
+
+    assert get_redis().connection_pool is get_redis().connection_pool
+    assert get_queue("exports") is get_queue("exports")
+    assert get_queue("exports").connection.connection_pool is get_redis().connection_pool
+
+
+def test_export_status_is_cached_briefly(client):
+    fakeredis = pytest.importorskip("fakeredis")
+    from rq import Queue
+    from app.api import logs as logs_api
+
+    queue = Queue("exports", connection=fakeredis.FakeRedis())
+    job = queue.enqueue(export_jobs.export_logs_csv_job, None, None, None, None)
+    logs_api._export_status_cache.clear()
+    with patch("app.api.logs.get_queue", return_value=queue), patch.object(queue, "fetch_job", wraps=queue.fetch_job) as fetch_job:
+        for _ in range(3):
+            r = client.get(f"/api/v1/logs/export/{job.id}")
+            assert r.json()["data"]["status"] == "queued"
+    assert fetch_job.call_count == 1
+    logs_api._export_status_cache.clear()
+
+
+def test_export_status_of_a_running_single_job(client, monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    from rq import Queue
+    from app.api import logs as logs_api
+    from app.core.config import settings
+
+    queue = Queue("exports", connection=fakeredis.FakeRedis())
+    job = queue.enqueue(export_jobs.export_logs_csv_job, None, None, None, None)
+    job.set_status("started")
+    job.meta["progress"] = {"rows": 5, "total_estimate": 10, "bytes": 120}
+    job.save_meta()
+    monkeypatch.setattr(logs_api, "get_queue", lambda name: queue)
+    monkeypatch.setattr(settings, "EXPORT_STATUS_CACHE_TTL", 0)
+
+    r = client.get(f"/api/v1/logs/export/{job.id}")
+    assert r.status_code == 200
+    assert r.json()["data"] == {"status": "started", "progress": {"rows": 5, "total_estimate": 10, "bytes": 120}}
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_export_resumes_from_checkpoint_after_crash(client, engine, tmp_path, monkeypatch, compress):
+    fakeredis = pytest.importorskip("fakeredis")
+    from rq import Queue, Retry
+    from app.core.config import settings
+    from app.repositories.log_repository import LogRepository
+
+    source = f"resume-{compress}"
+    for i in range(7):
+        client.post("/api/v1/logs/", json={"severity": "INFO", "source": source, "message": f"r{i}"})
+    queue = Queue("exports", connection=fakeredis.FakeRedis())
+    job = queue.enqueue(export_jobs.export_logs_csv_job, None, None, None, source, compress, retry=Retry(max=1))
+    monkeypatch.setenv("EXPORT_DIR", str(tmp_path))
+    monkeypatch.setattr(export_jobs, "EXPORT_BATCH_SIZE", 1)
+    monkeypatch.setattr(settings, "EXPORT_CHECKPOINT_ROWS", 2)
+    monkeypatch.setattr(export_jobs, "get_current_job", lambda: job)
+    monkeypatch.setattr(export_jobs, "SessionLocal", sessionmaker(bind=engine))
+
+    written = []
+    format_row = export_jobs.format_csv_row
+
+    def crash_on_fifth_row(row):
+        written.append(row.message)
+        if len(written) == 5:
+            raise RuntimeError("worker died")
+        return format_row(row)
+
+    with patch.object(export_jobs, "format_csv_row", crash_on_fifth_row), pytest.raises(RuntimeError):
+        export_jobs.export_logs_csv_job(None, None, None, source, compress)
+    assert job.meta["checkpoint"]["rows"] == 4
+    assert job.meta["progress"]["total_estimate"] == 7
+
+    with patch.object(LogRepository, "stream", autospec=True, side_effect=LogRepository.stream) as stream:
+        path = export_jobs.export_logs_csv_job(None, None, None, source, compress)
+    assert stream.call_args.kwargs["cursor"][1] is not None
+
+    opener = gzip.open if compress else open
+    with opener(path, "rt", newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["timestamp", "severity", "source", "message"]
+    assert [r[3] for r in rows[1:]] == [f"r{i}" for i in range(6, -1, -1)]
+    assert os.listdir(tmp_path) == [os.path.basename(path)]
+    saved = queue.fetch_job(job.id).meta
+    assert saved["progress"]["rows"] == 7 and saved["progress"]["bytes"] == os.path.getsize(path)
+    assert "checkpoint" not in saved
+
+
+def test_identical_exports_share_one_job_and_file(client, engine, tmp_path, monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    from rq import Queue, SimpleWorker
+    from app.api import logs as logs_api
+
+    client.post("/api/v1/logs/", json={"severity": "INFO", "source": "shared-export", "message": "s"})
+    queue = Queue("exports", connection=fakeredis.FakeRedis())
+    monkeypatch.setenv("EXPORT_DIR", str(tmp_path))
+    monkeypatch.setattr(export_jobs, "SessionLocal", sessionmaker(bind=engine))
+    monkeypatch.setattr(logs_api, "get_queue", lambda name: queue)
+    url = "/api/v1/logs/export?source=shared-export&start=2000-01-01T00:00:00"
+
+    first = client.post(url).json()["data"]
+    second = client.post(url + "Z").json()["data"]
+    assert second == {"job_id": first["job_id"], "reused": "in_flight"}
+    assert queue.count == 1
+
+    SimpleWorker([queue], connection=queue.connection).work(burst=True)
+    ready = client.post(url).json()["data"]
+    assert ready["job_id"] == first["job_id"] and ready["reused"] == "finished" and os.path.exists(ready["path"])
+    assert queue.count == 0
+
+    fresh = client.post(url + "&reuse=false").json()["data"]
+    assert fresh["job_id"] != first["job_id"] and queue.count == 1
+    SimpleWorker([queue], connection=queue.connection).work(burst=True)
+    assert client.post(url).json()["data"]["job_id"] == fresh["job_id"]
+
+    # An evicted file is neither served nor reused
+    os.remove(queue.fetch_job(fresh["job_id"]).return_value())
+    assert client.get(f"/api/v1/logs/export/{fresh['job_id']}/download").status_code == 404
+    replacement = client.post(url).json()["data"]
+    assert "reused" not in replacement and replacement["job_id"] not in (first["job_id"], fresh["job_id"])
+    assert queue.count == 1
+
+
+def test_partitioned_export_with_a_failed_part_is_not_reused(client, tmp_path, monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    from rq import Queue
+    from app.api import logs as logs_api
+
+    for i in range(2):
+        client.post("/api/v1/logs/", json={"severity": "INFO", "source": "failed-part", "message": f"m{i}"})
+    queue = Queue("exports", connection=fakeredis.FakeRedis())
+    monkeypatch.setenv("EXPORT_DIR", str(tmp_path))
+    monkeypatch.setattr(logs_api, "get_queue", lambda name: queue)
+    url = "/api/v1/logs/export?source=failed-part&parts=2"
+
+    first = client.post(url).json()["data"]
+    assert client.post(url).json()["data"]["reused"] == "in_flight"
+    part_id = queue.fetch_job(first["job_id"]).meta["parts"][0]
+    queue.fetch_job(part_id).set_status("failed")
+
+    replacement = client.post(url).json()["data"]
+    assert "reused" not in replacement and replacement["job_id"] != first["job_id"]
+    assert client.post(url).json()["data"]["job_id"] == replacement["job_id"]
+
+
+def _read_export(path, export_format, compress):
+    if export_format == "parquet":
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(path)
+        return [tuple(str(v) for v in row.values()) for row in table.to_pylist()]
+    with (gzip.open(path, "rt", newline="") if compress else open(path, newline="")) as f:
+        return [tuple(row) for row in csv.reader(f)]
+
+
+@pytest.mark.parametrize("export_format,compress", [("csv", False), ("csv", True), ("parquet", False)])
+def test_partitioned_export_matches_single_job(client, db_session, engine, tmp_path, monkeypatch, export_format, compress):
+    fakeredis = pytest.importorskip("fakeredis")
+    if export_format == "parquet":
+        pytest.importorskip("pyarrow")
+    from rq import Queue, SimpleWorker
+    from app.api import logs as logs_api
+    from app.core.config import settings
+    from app.repositories.log_repository import LogRepository
+
+    source = f"parts-e2e-{export_format}-{compress}"
+    LogRepository(db_session).bulk_create([
+        {"timestamp": datetime(2021, 4, 1, 12, minute), "severity": "INFO" if minute % 3 else "ERROR", "source": source, "message": f"row {minute}"}
+        for minute in range(10)
+    ])
+    queue = Queue("exports", connection=fakeredis.FakeRedis())
+    monkeypatch.setenv("EXPORT_DIR", str(tmp_path))
+    monkeypatch.setattr(export_jobs, "SessionLocal", sessionmaker(bind=engine))
+    monkeypatch.setattr(logs_api, "get_queue", lambda name: queue)
+    monkeypatch.setattr(settings, "EXPORT_STATUS_CACHE_TTL", 0)
+    url = f"/api/v1/logs/export?source={source}&format={export_format}&compress={str(compress).lower()}&reuse=false"
+
+    single_id = client.post(url).json()["data"]["job_id"]
+    enqueued = client.post(url + "&parts=3").json()["data"]
+    assert enqueued["parts"] == 3
+    pending = client.get(f"/api/v1/logs/export/{enqueued['job_id']}").json()["data"]
+    assert pending["status"] == "deferred"
+    assert (pending["progress"]["parts"], pending["progress"]["finished"], pending["progress"]["failed"]) == (3, 0, 0)
+
+    SimpleWorker([queue], connection=queue.connection).work(burst=True)
+
+    done = client.get(f"/api/v1/logs/export/{enqueued['job_id']}").json()["data"]
+    assert done["status"] == "finished"
+    assert (done["progress"]["parts"], done["progress"]["finished"], done["progress"]["failed"]) == (3, 3, 0)
+    assert done["progress"]["rows"] == 10
+    single_path = queue.fetch_job(single_id).return_value()
+    combined = _read_export(done["path"], export_format, compress)
+    assert combined == _read_export(single_path, export_format, compress)
+    assert [row[3] for row in combined if row[3] != "message"] == [f"row {minute}" for minute in reversed(range(10))]
+    # Part outputs are removed once concatenated
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(p) for p in (single_path, done["path"]))
+
+
+def test_partitioned_export_keeps_parts_and_names_missing_ones(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    from rq import Queue
+    from app.core.config import settings
+
+    queue = Queue("exports", connection=fakeredis.FakeRedis())
+    hi = datetime(2024, 1, 2)
+    job = export_jobs.enqueue_partitioned_export(queue, export_jobs.split_time_range(hi - timedelta(days=1), hi, 2), None, None, False, "csv")
+    parts = [queue.fetch_job(part_id) for part_id in job.meta["parts"]]
+    assert all(part.result_ttl == settings.EXPORT_MAX_AGE and part.failure_ttl == settings.EXPORT_MAX_AGE for part in parts)
+
+    parts[1].delete()
+    monkeypatch.setattr(export_jobs, "get_current_job", lambda: job)
+    with pytest.raises(RuntimeError, match=parts[1].id):
+        export_jobs.finalize_export_job(job.meta["parts"])
+
+
+def test_sweep_exports_enforces_age_and_size(tmp_path):
+    from app.jobs.export_sweeper import sweep_exports
+
+    now = 1_000_000.0
+    files = {"logs_export_old.csv": 5000, "logs_export_a.csv": 1000, "logs_export_b.csv": 1000, "logs_export_c.csv.part": 1000, "logs_export_d.csv.segment": 1000, "other.csv": 9000}
+    ages = {"logs_export_old.csv": 7200, "logs_export_a.csv": 300, "logs_export_b.csv": 200, "logs_export_c.csv.part": 100, "logs_export_d.csv.segment": 400, "other.csv": 9999}
+    for name, size in files.items():
+        path = tmp_path / name
+        path.write_bytes(b"x" * size)
+        os.utime(path, (now - ages[name], now - ages[name]))
+
+    result = sweep_exports(str(tmp_path), max_bytes=2500, max_age=3600, now=now)
+    assert result == {"removed": 3, "freed_bytes": 7000, "remaining_bytes": 2000}
+    assert sorted(os.listdir(tmp_path)) == ["logs_export_c.csv.part", "logs_export_d.csv.segment", "other.csv"]
+
+
+def test_split_time_range_is_contiguous_newest_first():
+    lo = datetime(2024, 1, 1)
+    hi = datetime(2024, 1, 2)
+    ranges = export_jobs.split_time_range(lo, hi, 4)
+    assert len(ranges) == 4
+    assert ranges[0][1] == hi
+    assert ranges[-1][0] == lo
+    for newer, older in zip(ranges, ranges[1:]):
+        assert older[1] + timedelta(microseconds=1) == newer[0]
+    assert export_jobs.split_time_range(lo, lo, 4) == [(lo, lo)]
@@ -0,0 +1,49 @@
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.repositories.log_repository import LogRepository
+from app.services.ingest_buffer import IngestBuffer, get_ingest_buffer
+
+
+def test_buffered_create_flushes_in_group(client, engine):
+    buffer = IngestBuffer(sessionmaker(bind=engine), max_size=2, batch_size=10, flush_interval=60)
+    app.dependency_overrides[get_ingest_buffer] = lambda: buffer
+
+    payload = {"severity": "INFO", "source": "buffered", "message": "queued"}
+    assert client.post("/api/v1/logs/", json=payload).status_code == 202
+    assert client.post("/api/v1/logs/", json=payload).status_code == 202
+    r = client.post("/api/v1/logs/", json=payload)
+    assert r.status_code == 429
+    assert r.headers["retry-after"] == "1"
+
+    buffer.start()
+    buffer.stop()
+    assert buffer.stats() == {"pending": 0, "capacity": 2, "buffered": 2, "flushed": 2, "dropped": 1}
+
+    r2 = client.get("/api/v1/logs/?source=buffered")
+    assert r2.json()["data"]["total"] == 2
+
+
+def test_buffered_rows_keep_their_accept_time(client, engine, db_session):
+    buffer = IngestBuffer(sessionmaker(bind=engine), max_size=10, batch_size=10, flush_interval=60)
+    app.dependency_overrides[get_ingest_buffer] = lambda: buffer
+
+    before = datetime.now(timezone.utc)
+    assert client.post("/api/v1/logs/", json={"severity": "INFO", "source": "buffered-time", "message": "late flush"}).status_code == 202
+    accepted = datetime.now(timezone.utc)
+    time.sleep(0.2)
+    buffer.start()
+    buffer.stop()
+
+    [row] = LogRepository(db_session).list(None, None, None, "buffered-time", 10, 0)
+    stored = row.timestamp if row.timestamp.tzinfo else row.timestamp.replace(tzinfo=timezone.utc)
+    assert before <= stored <= accepted
+
+
+def test_ingest_stats(client):
+    r = client.get("/api/v1/internal/stats/ingest")
+    assert r.status_code == 200
+    assert r.json()["data"]["mode"] == "sync"
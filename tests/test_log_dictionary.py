@@ -0,0 +1,84 @@
+from sqlalchemy import create_engine, event, func, select
+
+from app.core.database import Base
+from app.models.log import Log
+from app.models.log_dictionary import LogSource
+from app.models.log_migration import migrate_legacy_logs
+from app.models.log_search import install_search_index, message_match
+from app.repositories.log_dictionary_repository import LogDictionaryRepository, sources
+from app.repositories.log_repository import LogRepository
+
+
+def test_values_are_interned_once(db_session):
+    repo = LogRepository(db_session)
+    ids = repo.bulk_create([
+        {"severity": "INFO", "source": "dict-src", "message": "repeated text"},
+        {"severity": "INFO", "source": "dict-src", "message": "repeated text"},
+    ])
+    repo.create("INFO", "dict-src", "repeated text")
+    first, second = repo.get(ids[0]), repo.get(ids[1])
+    assert first.message_id == second.message_id
+    assert (first.severity, first.source, first.message) == ("INFO", "dict-src", "repeated text")
+    assert db_session.execute(select(func.count()).select_from(LogSource).where(LogSource.name == "dict-src")).scalar() == 1
+    assert repo.count(None, None, None, "dict-src") == 3
+    assert repo.count(None, None, None, "never-seen") == 0
+
+
+def test_rolled_back_entries_are_not_cached(db_session):
+    dictionary = LogDictionaryRepository(db_session)
+    entry_id = dictionary.intern(sources, ["dict-rollback"])["dict-rollback"]
+    assert dictionary.resolve(sources, [entry_id]) == {entry_id: "dict-rollback"}
+    db_session.rollback()
+
+    assert sources.ids.get("dict-rollback") is None
+    assert dictionary.lookup(sources, "dict-rollback") is None
+
+
+def test_legacy_text_columns_are_migrated(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        # logs as created before dictionary encoding
+        conn.exec_driver_sql(
+            "CREATE TABLE logs (id INTEGER PRIMARY KEY, timestamp DATETIME NOT NULL, "
+            "severity VARCHAR NOT NULL, source VARCHAR NOT NULL, message VARCHAR NOT NULL)"
+        )
+        conn.exec_driver_sql("CREATE INDEX ix_logs_ts_sev_src ON logs (timestamp, severity, source)")
+        conn.exec_driver_sql(
+            "INSERT INTO logs VALUES (7, '2024-01-01 00:00:00', 'INFO', 'legacy-a', 'disk full'), "
+            "(9, '2024-01-01 00:01:00', 'ERROR', 'legacy-b', 'disk full'), "
+            "(12, '2024-01-01 00:02:00', 'INFO', 'legacy-a', 'rebooted')"
+        )
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        assert migrate_legacy_logs(conn)
+        install_search_index(conn)
+    with engine.begin() as conn:
+        assert not migrate_legacy_logs(conn)
+        rows = conn.exec_driver_sql(
+            "SELECT l.id, s.name, src.name, m.message FROM logs l JOIN log_severities s ON s.id = l.severity_id "
+            "JOIN log_sources src ON src.id = l.source_id JOIN log_messages m ON m.id = l.message_id ORDER BY l.id"
+        ).all()
+        matched = conn.execute(select(Log.id).where(message_match("rebooted"))).scalars().all()
+        assert conn.exec_driver_sql("SELECT count(*) FROM log_messages").scalar() == 2
+    engine.dispose()
+
+    assert rows == [(7, "INFO", "legacy-a", "disk full"), (9, "ERROR", "legacy-b", "disk full"), (12, "INFO", "legacy-a", "rebooted")]
+    assert matched == [12]
+
+
+def test_new_entries_are_inserted_in_sorted_order(db_session):
+    inserted = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO log_sources"):
+            # One multi-row INSERT ... RETURNING with the values as flat parameters
+            inserted.extend(parameters)
+
+    connection = db_session.connection()
+    event.listen(connection, "before_cursor_execute", _capture)
+    try:
+        LogDictionaryRepository(db_session).intern(sources, ["dict-order-c", "dict-order-a", "dict-order-b", "dict-order-a"])
+    finally:
+        event.remove(connection, "before_cursor_execute", _capture)
+    db_session.rollback()
+    assert inserted == ["dict-order-a", "dict-order-b", "dict-order-c"]
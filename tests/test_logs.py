@@ -1,3 +1,4 @@
+import json
 from datetime import datetime
 
 
@@ -42,3 +43,141 @@ def test_update_and_delete(client):
     r4 = client.get(f"/api/v1/logs/{log_id}")
     assert r4.status_code == 404
 
+
+
+def test_create_batch(client):
+    items = [
+        {"severity": "INFO", "source": "batch", "message": "b1"},
+        {"severity": "", "source": "batch", "message": "bad"},
+        {"severity": "ERROR", "source": "batch", "message": "b2"},
+    ]
+    r = client.post("/api/v1/logs/batch", json={"items": items})
+    assert r.status_code == 201
+    data = r.json()["data"]
+    assert data["accepted"] == 2
+    assert data["rejected"] == 1
+    assert data["ids"][1] is None
+    assert data["errors"][0]["index"] == 1
+
+    r2 = client.get(f"/api/v1/logs/{data['ids'][2]}")
+    assert r2.json()["data"]["log"]["message"] == "b2"
+
+    r3 = client.post("/api/v1/logs/batch", json={"items": [{"severity": "INFO"}]})
+    assert r3.status_code == 422
+
+
+def test_list_cursor_pagination(client):
+    for i in range(5):
+        client.post("/api/v1/logs/", json={"severity": "INFO", "source": "cursor", "message": f"c{i}"})
+
+    seen = []
+    cursor = None
+    while True:
+        url = "/api/v1/logs/?source=cursor&limit=2"
+        if cursor:
+            url += f"&cursor={cursor}"
+        data = client.get(url).json()["data"]
+        seen.extend(l["id"] for l in data["logs"])
+        cursor = data["next_cursor"]
+        if not cursor:
+            break
+    assert len(seen) == 5
+    assert seen == sorted(seen, reverse=True)
+
+    r = client.get("/api/v1/logs/?cursor=not-a-cursor")
+    assert r.status_code == 400
+
+
+def test_list_total_modes(client):
+    for i in range(3):
+        client.post("/api/v1/logs/", json={"severity": "INFO", "source": "totals", "message": f"t{i}"})
+
+    data = client.get("/api/v1/logs/?source=totals&total=none").json()["data"]
+    assert data["total"] is None
+    assert data["total_mode"] == "none"
+
+    data = client.get("/api/v1/logs/?source=totals&total=estimate").json()["data"]
+    assert data["total"] == 3
+    assert data["total_exact"] is True
+
+    first = client.get("/api/v1/logs/?source=totals&total=cached").json()["data"]
+    client.post("/api/v1/logs/", json={"severity": "INFO", "source": "totals", "message": "t3"})
+    second = client.get("/api/v1/logs/?source=totals&total=cached").json()["data"]
+    assert first["total"] == second["total"] == 3
+    assert second["total_exact"] is False
+
+    # The same instant written with a different offset, or naive, shares the cached count
+    client.get("/api/v1/logs/?source=totals&total=cached&start=2000-01-01T02:00:00%2B02:00")
+    for start in ("2000-01-01T00:00:00Z", "2000-01-01T00:00:00"):
+        assert client.get(f"/api/v1/logs/?source=totals&total=cached&start={start}").json()["data"]["total_exact"] is False
+
+    assert client.get("/api/v1/logs/?total=bogus").status_code == 422
+
+
+def test_stream_ndjson_and_csv(client):
+    for i in range(3):
+        client.post("/api/v1/logs/", json={"severity": "DEBUG", "source": "stream", "message": f"s{i}"})
+
+    r = client.get("/api/v1/logs/stream?source=stream")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert [l["message"] for l in lines] == ["s2", "s1", "s0"]
+
+    r2 = client.get("/api/v1/logs/stream?source=stream&format=csv")
+    assert r2.status_code == 200
+    rows = r2.text.splitlines()
+    assert rows[0] == "timestamp,severity,source,message"
+    assert len(rows) == 4
+
+
+def test_message_search(client):
+    client.post("/api/v1/logs/", json={"severity": "ERROR", "source": "search", "message": "Database timeout after 30s"})
+    client.post("/api/v1/logs/", json={"severity": "INFO", "source": "search", "message": "Database connection established"})
+    r = client.post("/api/v1/logs/", json={"severity": "INFO", "source": "search", "message": "Cache miss"})
+    log_id = r.json()["data"]["log"]["id"]
+
+    data = client.get("/api/v1/logs/?source=search&q=database timeout").json()["data"]
+    assert [l["message"] for l in data["logs"]] == ["Database timeout after 30s"]
+    assert data["total"] == 1
+
+    data = client.get("/api/v1/logs/?source=search&q=database").json()["data"]
+    assert data["total"] == 2
+
+    # The index follows updates and deletes
+    client.patch(f"/api/v1/logs/{log_id}", json={"message": "Database cache miss"})
+    assert client.get("/api/v1/logs/?source=search&q=database").json()["data"]["total"] == 3
+    client.delete(f"/api/v1/logs/{log_id}")
+    assert client.get("/api/v1/logs/?source=search&q=database").json()["data"]["total"] == 2
+
+    # Query syntax characters are treated as plain text
+    assert client.get('/api/v1/logs/?q="timeout OR*').status_code == 200
+    assert client.get("/api/v1/logs/?source=search&q=%20%20%20").json()["data"]["total"] == 2
+    assert client.get("/api/v1/logs/?source=search&q=%20database%20%20timeout%20").json()["data"]["total"] == 1
+
+    r = client.get("/api/v1/logs/stream?source=search&q=timeout")
+    assert len(r.text.splitlines()) == 1
+
+
+def test_list_fast_path_is_byte_compatible(client, monkeypatch):
+    from fastapi.responses import JSONResponse
+
+    from app.core import serialization
+    from app.schemas.log import LogResponse
+    from app.schemas.user import APIResponse
+
+    for message in ["plain", "ünïcödé ☃ \"quoted\" back\\slash", "tab\tnew\nline\x01"]:
+        client.post("/api/v1/logs/", json={"severity": "INFO", "source": "bytes", "message": message})
+
+    def expected(body):
+        # What FastAPI produces for the same data through response_model=APIResponse
+        data = dict(body["data"], logs=[LogResponse.model_validate(l).model_dump() for l in body["data"]["logs"]])
+        return JSONResponse(APIResponse(success=True, message="Logs fetched", data=data).model_dump(mode="json")).body
+
+    r = client.get("/api/v1/logs/?source=bytes&limit=2")
+    assert r.headers["content-type"] == "application/json"
+    assert r.content == expected(r.json())
+
+    monkeypatch.setattr(serialization, "orjson", None)
+    r2 = client.get("/api/v1/logs/?source=bytes")
+    assert r2.content == expected(r2.json())
@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+
+def test_async_log_routes(test_db_url, engine):
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    from app.api import logs_async
+    from app.core.database import async_database_url, get_async_db
+
+    async_engine = create_async_engine(async_database_url(test_db_url))
+    sessions = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    async def _override_get_async_db():
+        async with sessions() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(logs_async.router, prefix="/api/v1/logs")
+    app.dependency_overrides[get_async_db] = _override_get_async_db
+
+    with TestClient(app) as client:
+        r = client.post("/api/v1/logs/", json={"severity": "INFO", "source": "async", "message": "async hello"})
+        assert r.status_code == 201
+        log_id = r.json()["data"]["log"]["id"]
+        r2 = client.post("/api/v1/logs/batch", json={"items": [{"severity": "ERROR", "source": "async", "message": "async batch"}]})
+        assert r2.json()["data"]["accepted"] == 1
+
+        assert client.get(f"/api/v1/logs/{log_id}").json()["data"]["log"]["message"] == "async hello"
+        assert client.get("/api/v1/logs/999999").status_code == 404
+        listed = client.get("/api/v1/logs/?source=async&q=batch").json()["data"]
+        assert [l["message"] for l in listed["logs"]] == ["async batch"]
+        buckets = client.get("/api/v1/logs/aggregate/by/severity?source=async").json()["data"]["aggregation"]["buckets"]
+        assert sorted((b["key"], b["count"]) for b in buckets) == [("ERROR", 1), ("INFO", 1)]
+        histogram = client.get("/api/v1/logs/aggregate/histogram?interval=1d&source=async").json()["data"]["histogram"]
+        assert sum(b["count"] for b in histogram["buckets"]) == 2
+        client.portal.call(async_engine.dispose)
+
+
+def test_async_routes_use_query_cache_off_the_event_loop(test_db_url, engine):
+    pytest.importorskip("aiosqlite")
+    fakeredis = pytest.importorskip("fakeredis")
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    from app.api import logs_async
+    from app.core.database import async_database_url
+    from app.repositories.log_repository import AsyncLogRepository
+    from app.services.log_service import AsyncLogService
+    from app.services.query_cache import QueryCache
+
+    on_loop = []
+
+    class RecordingCache(QueryCache):
+        def _client(self):
+            try:
+                asyncio.get_running_loop()
+                on_loop.append(True)
+            except RuntimeError:
+                on_loop.append(False)
+            return super()._client()
+
+    cache = RecordingCache(fakeredis.FakeRedis, prefix="test:async-cache", ttl=30, max_entries=10)
+    async_engine = create_async_engine(async_database_url(test_db_url))
+    sessions = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    async def _override_service():
+        async with sessions() as db:
+            yield AsyncLogService(AsyncLogRepository(db), cache)
+
+    app = FastAPI()
+    app.include_router(logs_async.router, prefix="/api/v1/logs")
+    app.dependency_overrides[logs_async.get_async_log_service] = _override_service
+
+    with TestClient(app) as client:
+        client.post("/api/v1/logs/", json={"severity": "INFO", "source": "async-cache", "message": "one"})
+        first = client.get("/api/v1/logs/?source=async-cache").json()
+        assert client.get("/api/v1/logs/?source=async-cache").json() == first
+        assert client.get("/api/v1/logs/aggregate/by/severity?source=async-cache").json()["data"]["aggregation"]["buckets"] == [{"key": "INFO", "count": 1}]
+        assert (cache.hits, cache.misses) == (1, 2)
+
+        client.post("/api/v1/logs/", json={"severity": "ERROR", "source": "async-cache", "message": "two"})
+        assert client.get("/api/v1/logs/?source=async-cache").json()["data"]["total"] == 2
+        client.portal.call(async_engine.dispose)
+
+    assert on_loop and not any(on_loop)
+
+
+def test_estimate_explain_binds_per_dialect():
+    from datetime import datetime
+
+    from sqlalchemy import select
+    from sqlalchemy.dialects.postgresql import asyncpg, psycopg2
+
+    from app.models.log import Log
+    from app.repositories.log_repository import explain
+
+    stmt = explain(select(Log.id).where(Log.timestamp >= datetime(2024, 1, 1)))
+    assert str(stmt.compile(dialect=asyncpg.dialect())).startswith("EXPLAIN (FORMAT JSON) SELECT")
+    assert "$1" in str(stmt.compile(dialect=asyncpg.dialect()))
+    assert "%(timestamp_1)s" in str(stmt.compile(dialect=psycopg2.dialect()))
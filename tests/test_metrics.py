@@ -0,0 +1,53 @@
+import re
+import pytest
+
+from app.core import metrics
+
+
+def _sample(text, name, **labels):
+    selector = ",".join(f'{k}="{v}"' for k, v in labels.items())
+    match = re.search(rf"^{re.escape(name)}{re.escape('{' + selector + '}' if selector else '')} (\S+)$", text, re.M)
+    return float(match.group(1)) if match else None
+
+
+def test_metrics_cover_routes_sql_and_ingest(client, engine):
+    metrics.instrument_engine(engine)
+    before = _sample(client.get("/metrics").text, "log_rows_ingested_total") or 0
+
+    log_id = client.post("/api/v1/logs/", json={"severity": "INFO", "source": "metrics", "message": "m"}).json()["data"]["log"]["id"]
+    client.post("/api/v1/logs/batch", json={"items": [{"severity": "INFO", "source": "metrics", "message": str(i)} for i in range(3)]})
+    client.get(f"/api/v1/logs/{log_id}")
+    client.get("/does-not-exist")
+
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+    text = r.text
+    assert _sample(text, "log_rows_ingested_total") == before + 4
+    assert _sample(text, "http_request_duration_seconds_count", method="GET", route="/api/v1/logs/{log_id}", status="200") >= 1
+    assert _sample(text, "http_request_duration_seconds_count", method="GET", route="unmatched", status="404") >= 1
+    assert _sample(text, "http_request_sql_statements_sum", method="POST", route="/api/v1/logs/") > 0
+    assert _sample(text, "sql_statement_duration_seconds_count", operation="INSERT") > 0
+    assert _sample(text, "rq_up") in (0, 1)
+
+
+def test_histogram_buckets_are_cumulative():
+    h = metrics.Histogram("t_seconds", "test", ("op",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3):
+        h.observe(value, "x")
+    text = "\n".join(h.render())
+    assert _sample(text, "t_seconds_bucket", op="x", le="0.1") == 1
+    assert _sample(text, "t_seconds_bucket", op="x", le="1.0") == 3
+    assert _sample(text, "t_seconds_bucket", op="x", le="+Inf") == 4
+    assert _sample(text, "t_seconds_count", op="x") == 4
+
+
+def test_job_durations_round_trip_through_redis():
+    fakeredis = pytest.importorskip("fakeredis")
+    redis = fakeredis.FakeRedis()
+    metrics.record_job_duration(redis, "export_logs_csv_job", "finished", 12.0)
+    metrics.record_job_duration(redis, "export_logs_csv_job", "finished", 120.0)
+    text = "\n".join(metrics.render_job_durations(redis) + metrics.render_queue(redis, "exports"))
+    assert _sample(text, "rq_job_duration_seconds_bucket", job="export_logs_csv_job", status="finished", le="15.0") == 1
+    assert _sample(text, "rq_job_duration_seconds_count", job="export_logs_csv_job", status="finished") == 2
+    assert _sample(text, "rq_queue_jobs", queue="exports", state="queued") == 0
@@ -0,0 +1,44 @@
+import pytest
+
+from app.api.logs import get_log_service
+from app.main import app
+from app.repositories.log_repository import LogRepository
+from app.services.log_service import LogService
+from app.services.query_cache import QueryCache
+
+
+@pytest.fixture()
+def cache():
+    fakeredis = pytest.importorskip("fakeredis")
+    return QueryCache(fakeredis.FakeRedis, prefix="test:query-cache", ttl=30, max_entries=2)
+
+
+def test_list_and_aggregate_served_from_cache_until_write(client, db_session, cache):
+    app.dependency_overrides[get_log_service] = lambda: LogService(LogRepository(db_session), cache)
+    client.post("/api/v1/logs/", json={"severity": "INFO", "source": "qcache", "message": "first"})
+
+    r1 = client.get("/api/v1/logs/?source=qcache")
+    r2 = client.get("/api/v1/logs/?source=qcache")
+    assert r1.json() == r2.json()
+    assert client.get("/api/v1/logs/aggregate/by/severity?source=qcache").json()["data"]["aggregation"]["buckets"] == [{"key": "INFO", "count": 1}]
+    assert (cache.hits, cache.misses) == (1, 2)
+
+    client.post("/api/v1/logs/", json={"severity": "ERROR", "source": "qcache", "message": "second"})
+    assert client.get("/api/v1/logs/?source=qcache").json()["data"]["total"] == 2
+    buckets = client.get("/api/v1/logs/aggregate/by/severity?source=qcache").json()["data"]["aggregation"]["buckets"]
+    assert sorted(b["key"] for b in buckets) == ["ERROR", "INFO"]
+    assert cache.hits == 1
+
+
+def test_cache_is_size_bounded(cache):
+    for i in range(5):
+        assert cache.get_or_compute("t", {"i": i}, lambda: i) == i
+    redis = cache._client()
+    assert redis.zcard("test:query-cache:index") == 2
+    assert len(redis.keys("test:query-cache:t:*")) == 2
+
+
+def test_query_cache_stats(client):
+    r = client.get("/api/v1/internal/stats/query-cache")
+    assert r.status_code == 200
+    assert r.json()["data"]["enabled"] is False
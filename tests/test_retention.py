@@ -0,0 +1,48 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.jobs import retention_jobs
+from app.models.log_dictionary import LogMessage
+from app.models.log_partition import partition_bounds, partition_name, period_start
+from app.repositories.log_dictionary_repository import messages
+from app.repositories.log_repository import LogRepository
+
+
+def test_partition_periods():
+    start = period_start(datetime(2024, 12, 31, 23, 59), "month")
+    assert partition_name(start, "month") == "logs_p202412"
+    assert partition_bounds("logs_p202412", "month") == (start, datetime(2025, 1, 1, tzinfo=timezone.utc))
+    assert partition_bounds("logs_p20240229", "day")[1] == datetime(2024, 3, 1, tzinfo=timezone.utc)
+    assert partition_bounds("logs_default", "day") is None
+
+
+def test_retention_job_removes_old_logs_and_rollups(engine, db_session, monkeypatch):
+    repo = LogRepository(db_session)
+    old = repo.bulk_create([
+        {"timestamp": datetime(2019, 3, 1, 12, m), "severity": "INFO", "source": "retention", "message": "old entry"}
+        for m in range(5)
+    ])
+    new = repo.bulk_create([
+        {"timestamp": datetime(2019, 3, 20, 12, m), "severity": "INFO", "source": "retention", "message": "new entry"}
+        for m in range(3)
+    ])
+
+    monkeypatch.setattr(settings, "LOG_RETENTION_DAYS", 10)
+    monkeypatch.setattr(settings, "LOG_RETENTION_BATCH_SIZE", 2)
+    monkeypatch.setattr(retention_jobs, "SessionLocal", sessionmaker(bind=engine))
+    result = retention_jobs.apply_retention_job(now=datetime(2019, 3, 25, tzinfo=timezone.utc))
+    assert result["dropped_partitions"] == [] and result["deleted_rows"] == 5
+    assert result["deleted_messages"] >= 1
+
+    db_session.expire_all()
+    assert all(repo.get(i) is None for i in old)
+    assert all(repo.get(i) is not None for i in new)
+    assert repo.aggregate(None, None, None, "retention", "severity") == [{"key": "INFO", "count": 3}]
+    assert repo.count(None, None, None, "retention", q="old") == 0
+    # The message only the removed logs used is gone, the one still in use stays
+    stored = set(db_session.execute(select(LogMessage.message)).scalars())
+    assert "old entry" not in stored and "new entry" in stored
+    assert messages.ids.get("old entry") is None
@@ -0,0 +1,109 @@
+from datetime import datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import Base
+from app.models.log import Log
+from app.models.log_dictionary import LogMessage, LogSeverity, LogSource
+from app.repositories.log_repository import LogRepository
+from app.repositories.log_rollup_repository import LogRollupRepository
+
+
+def _seed(repo):
+    rows = []
+    for minute in range(10):
+        for second in (0, 30, 59):
+            ts = datetime(2020, 5, 1, 10, minute, second)
+            rows.append({"timestamp": ts, "severity": "ERROR" if second == 30 else "INFO", "source": "rollup", "message": "r"})
+    return repo.bulk_create(rows)
+
+
+def test_aggregate_from_rollups_matches_raw(db_session, monkeypatch):
+    repo = LogRepository(db_session)
+    ids = _seed(repo)
+    repo.delete(repo.get(ids[0]))
+    updated = repo.update(repo.get(ids[3]), "WARNING", None, None)
+    assert updated.severity == "WARNING"
+
+    ranges = [
+        (None, None),
+        (datetime(2020, 5, 1, 10, 2, 15), datetime(2020, 5, 1, 10, 7, 30)),
+        (datetime(2020, 5, 1, 10, 3), datetime(2020, 5, 1, 10, 6)),
+        (datetime(2020, 5, 1, 10, 4, 10), datetime(2020, 5, 1, 10, 4, 50)),
+    ]
+    for start, end in ranges:
+        monkeypatch.setattr(settings, "LOG_ROLLUPS_ENABLED", True)
+        from_rollups = repo.aggregate(start, end, None, "rollup", "severity")
+        monkeypatch.setattr(settings, "LOG_ROLLUPS_ENABLED", False)
+        raw = repo.aggregate(start, end, None, "rollup", "severity")
+        assert sorted(from_rollups, key=lambda b: b["key"]) == sorted(raw, key=lambda b: b["key"])
+
+    monkeypatch.setattr(settings, "LOG_ROLLUPS_ENABLED", True)
+    totals = {b["key"]: b["count"] for b in repo.aggregate(None, None, None, "rollup", "severity")}
+    assert totals == {"INFO": 18, "ERROR": 10, "WARNING": 1}
+
+    repo.rollups.rebuild()
+    rebuilt = {b["key"]: b["count"] for b in repo.aggregate(None, None, None, "rollup", "severity")}
+    assert rebuilt == totals
+
+
+def test_rollups_stay_current_while_reads_are_disabled(db_session, monkeypatch):
+    repo = LogRepository(db_session)
+    monkeypatch.setattr(settings, "LOG_ROLLUPS_ENABLED", False)
+    ids = repo.bulk_create([
+        {"timestamp": datetime(2020, 8, 1, 9, minute), "severity": "INFO", "source": "rollup-toggle", "message": "t"}
+        for minute in range(4)
+    ])
+    repo.create("ERROR", "rollup-toggle", "t")
+    repo.update(repo.get(ids[0]), "WARNING", None, None)
+    repo.delete(repo.get(ids[1]))
+    raw = repo.aggregate(None, None, None, "rollup-toggle", "severity")
+
+    monkeypatch.setattr(settings, "LOG_ROLLUPS_ENABLED", True)
+    from_rollups = repo.aggregate(None, None, None, "rollup-toggle", "severity")
+    assert sorted(from_rollups, key=lambda b: b["key"]) == sorted(raw, key=lambda b: b["key"])
+    assert sorted((b["key"], b["count"]) for b in raw) == [("ERROR", 1), ("INFO", 2), ("WARNING", 1)]
+
+
+def test_histogram_is_dense_and_matches_raw(client, db_session, monkeypatch):
+    repo = LogRepository(db_session)
+    repo.bulk_create([
+        {"timestamp": datetime(2020, 6, 1, 8, 1, 10), "severity": "INFO", "source": "histo", "message": "h"},
+        {"timestamp": datetime(2020, 6, 1, 8, 3, 0), "severity": "ERROR", "source": "histo", "message": "h"},
+        {"timestamp": datetime(2020, 6, 1, 8, 14, 59), "severity": "INFO", "source": "histo", "message": "h"},
+    ])
+    url = "/api/v1/logs/aggregate/histogram?interval=5m&split=severity&source=histo&start=2020-06-01T08:00:30&end=2020-06-01T08:14:59"
+    for enabled in (True, False):
+        monkeypatch.setattr(settings, "LOG_ROLLUPS_ENABLED", enabled)
+        r = client.get(url)
+        assert r.status_code == 200
+        buckets = r.json()["data"]["histogram"]["buckets"]
+        assert [b["count"] for b in buckets] == [2, 0, 1]
+        assert buckets[0]["counts"] == {"ERROR": 1, "INFO": 1}
+        assert buckets[1]["counts"] == {"ERROR": 0, "INFO": 0}
+
+    r = client.get("/api/v1/logs/aggregate/histogram?interval=1m&start=2020-01-01T00:00:00&end=2020-12-31T00:00:00")
+    assert r.status_code == 400
+
+
+def test_empty_rollups_are_rebuilt_over_existing_logs(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'rollups.db'}")
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        # Rows written while rollups were disabled
+        info, source, message = LogSeverity(name="INFO"), LogSource(name="pre-existing"), LogMessage(message="p", digest="p")
+        db.add_all([info, source, message])
+        db.flush()
+        db.add_all([
+            Log(timestamp=datetime(2020, 7, 1, 9, 0, second), severity_id=info.id, source_id=source.id, message_id=message.id)
+            for second in (5, 10, 15)
+        ])
+        db.commit()
+
+        rollups = LogRollupRepository(db)
+        assert rollups.rebuild_if_empty()
+        assert rollups.counts(None, None, None, None, ("severity", "source")) == {("INFO", "pre-existing"): 3}
+        assert not rollups.rebuild_if_empty()
+    engine.dispose()
@@ -0,0 +1,46 @@
+import os
+import subprocess
+import sys
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.seed import generate_rows, parse_weights
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_generate_rows_follows_range_and_weights():
+    end = datetime(2024, 6, 1, tzinfo=timezone.utc)
+    start = end - timedelta(days=10)
+    batches = list(generate_rows(5000, start, end, {"INFO": 9, "ERROR": 1}, {"api": 1}, ["ok", "user {n}"], seed=3, batch_size=1000))
+    rows = [row for batch in batches for row in batch]
+    assert [len(b) for b in batches] == [1000] * 5
+    assert all(start <= r["timestamp"] <= end for r in rows)
+    assert rows[0]["timestamp"] < start + timedelta(days=1) and rows[-1]["timestamp"] > end - timedelta(days=1)
+    severities = Counter(r["severity"] for r in rows)
+    assert 0.85 < severities["INFO"] / len(rows) < 0.95
+    assert rows == [row for batch in generate_rows(5000, start, end, {"INFO": 9, "ERROR": 1}, {"api": 1}, ["ok", "user {n}"], seed=3, batch_size=1000) for row in batch]
+
+
+def test_parse_weights():
+    assert parse_weights("INFO=65, ERROR=5") == {"INFO": 65.0, "ERROR": 5.0}
+    with pytest.raises(Exception):
+        parse_weights("INFO")
+
+
+def test_bulk_seed_cli(tmp_path):
+    url = f"sqlite:///{tmp_path / 'seed.db'}"
+    subprocess.run(
+        [sys.executable, "-m", "app.seed", "--bulk", "--logs", "3000", "--days", "7", "--end", "2024-06-01T00:00:00", "--batch-size", "1000"],
+        cwd=ROOT, env={**os.environ, "DATABASE_URL": url}, check=True, capture_output=True,
+    )
+    engine = create_engine(url)
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM logs")).scalar() == 3000
+        assert conn.execute(text("SELECT sum(log_count) FROM log_rollups")).scalar() == 3000
+        days = conn.execute(text("SELECT count(DISTINCT date(timestamp)) FROM logs")).scalar()
+    engine.dispose()
+    assert days == 7
@@ -74,3 +74,43 @@ def test_users_crud(client):
     assert r6.status_code == status.HTTP_404_NOT_FOUND
 
 
+
+
+def test_profile_user_cache_invalidated_on_update(client, db_session):
+    payload = {"username": "carol", "password": "Secret@123", "name": "Carol", "email": "carol@example.com"}
+    user_id = client.post("/api/v1/auth/register", json=payload).json()["data"]["user"]["id"]
+    r = client.post("/api/v1/auth/login", data={"username": "carol", "password": "Secret@123"})
+    headers = {"Authorization": f"Bearer {r.json()['data']['token']['access_token']}"}
+    assert client.get("/api/v1/auth/profile", headers=headers).json()["data"]["user"]["name"] == "Carol"
+
+    # A change that bypasses UserService is not seen until the entry expires
+    from app.models.user import User
+    db_session.get(User, user_id).name = "Changed"
+    db_session.commit()
+    assert client.get("/api/v1/auth/profile", headers=headers).json()["data"]["user"]["name"] == "Carol"
+
+    client.patch(f"/api/v1/users/{user_id}", json={"is_active": False})
+    assert client.get("/api/v1/auth/profile", headers=headers).status_code == status.HTTP_403_FORBIDDEN
+
+    client.delete(f"/api/v1/users/{user_id}")
+    assert client.get("/api/v1/auth/profile", headers=headers).status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_login_rejected_fast_when_hasher_saturated(client, db_session):
+    from app.deps import get_auth_service
+    from app.main import app
+    from app.repositories.user_repository import UserRepository
+    from app.services.auth_service import AuthService
+    from app.services.password_hasher import PasswordHasher
+
+    hasher = PasswordHasher(workers=0, max_pending=0)
+    app.dependency_overrides[get_auth_service] = lambda: AuthService(UserRepository(db_session), hasher)
+    payload = {"username": "dave", "password": "Secret@123", "name": "Dave", "email": "dave@example.com"}
+    r = client.post("/api/v1/auth/register", json=payload)
+    assert r.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert r.headers["retry-after"] == "1"
+    assert hasher.stats()["rejected"] == 1
+
+    r2 = client.get("/api/v1/internal/stats/hashing")
+    assert r2.status_code == status.HTTP_200_OK
+    assert {"pending", "capacity", "completed", "rejected", "avg_ms", "max_ms"} <= set(r2.json()["data"])